@@ -0,0 +1,564 @@
+"""Benchmarks of the publications and software pipelines on synthetic inputs.
+
+Inputs are generated from a seed: BibTeX files with near-duplicate entries
+(title variants, DOIs in other case or missing) and repository records or
+URL lists. Each benchmark runs in a fresh process, so its peak RSS is its
+own. Function benchmarks that merge publications use a warm Crossref cache
+and a client knowing no works, so they never reach the network; end-to-end
+benchmarks run the update scripts against an ``http_replay`` server serving
+synthetic API answers, once cold and once warm (with the caches and manifest
+of the first run).
+
+Results list the best time of ``--repeat`` runs, throughput, peak RSS and
+the scaling exponent between consecutive sizes (1 is linear). They are
+compared against a stored baseline, and the run exits with status 1 when a
+case got slower than the tolerance allows. The baseline is committed in
+``benchmarks/``; timings depend on the machine, so before comparing a change,
+record your own baseline by running ``--save-baseline`` on the tree without
+the change.
+
+Usage:
+    git stash && python scripts/benchmark.py --save-baseline && git stash pop
+    python scripts/benchmark.py
+    python scripts/benchmark.py --cases merge_publications --max-size 10000
+    python scripts/benchmark.py --save-baseline
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import requests
+import instrumentation
+from crossref_cache import CrossrefCache
+from http_replay import FixtureStore
+from incremental import text_hash
+from update_publications import (ORCID_BULK_SIZE, _merge_frames, bibtex_entry_to_pub, format_publication,
+                                 generate_publications_page, get_bibtex_works, merge_publications,
+                                 publications_frame)
+from update_software import LANGUAGE_ICONS, generate_software_page
+
+log = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+BIBTEX_SIZES = (100, 1_000, 10_000, 100_000)
+# The grouping step is also timed at 40k entries, the size it was first tuned at
+MERGE_SIZES = (1_000, 10_000, 40_000, 100_000)
+REPO_SIZES = (10, 100, 1_000, 10_000)
+# Share of entries that repeat an earlier one, and share of those without the DOI
+DUPLICATE_RATE = 0.15
+MISSING_DOI_RATE = 0.5
+# Share of works also listed on ORCID
+ORCID_RATE = 0.1
+HIGHLIGHT_NAME = "Uri Neri"
+
+# Identities the synthetic API answers are served for
+BENCH_ORCID = "0000-0000-0000-0000"
+BENCH_GITHUB_USER = "bench-user"
+BENCH_GITLAB_INSTANCE = "https://gitlab.bench.test"
+BENCH_GITLAB_USER = "bench-gl"
+GITHUB_ACCEPT = 'application/vnd.github.v3+json'
+# Repositories per synthetic GitHub owner (one listing page each)
+REPOS_PER_OWNER = 100
+
+DEFAULT_RESULTS = Path(".cache/benchmark/results.json")
+DEFAULT_BASELINE = Path("benchmarks/baseline.json")
+DEFAULT_REPEAT = 3
+# A run longer than this is not repeated; timing noise matters little at that length
+LONG_RUN_SECONDS = 5.0
+DEFAULT_TOLERANCE = 0.25
+# Slowdowns smaller than this many seconds are noise, never regressions
+MIN_REGRESSION_SECONDS = 0.05
+# Timed fields compared against the baseline
+COMPARED_METRICS = ('seconds', 'warm_seconds')
+
+class Case(NamedTuple):
+    """A benchmark: input sizes, what one input item is, and how to set it up or run it."""
+    sizes: Tuple[int, ...]
+    unit: str
+    setup: Callable[[int, int, Path], Any]
+    end_to_end: bool = False
+
+# Synthetic data
+
+def _vocabulary(rng: random.Random, size: int = 5000) -> Tuple[List[str], List[float]]:
+    """Pseudo-words with Zipf weights, so titles share common words like real ones do."""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = list(dict.fromkeys(''.join(rng.choices(letters, k=rng.randint(3, 11))) for _ in range(size)))
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+def _title_variant(rng: random.Random, title: str) -> str:
+    """Spell a title the way another source would: case, punctuation, LaTeX markup."""
+    words = title.split()
+    i = rng.randrange(len(words))
+    variant = rng.randrange(5)
+    if variant == 0:
+        return title.lower()
+    if variant == 1:
+        return title + '.'
+    if variant == 2:
+        words[i] = '{' + words[i] + '}'
+    elif variant == 3:
+        words[i] = words[i].replace('e', "{\\'e}", 1)
+    else:
+        return title.title()
+    return ' '.join(words)
+
+def synthetic_entries(n: int, seed: int = 0) -> List[Dict]:
+    """Generate ``n`` BibTeX entries (as bibtexparser returns them) with realistic duplicates.
+
+    About ``DUPLICATE_RATE`` of the entries repeat an earlier work under a
+    variant title, half of them without the DOI. Every work has a DOI and a
+    complete record somewhere, so merging needs no Crossref call.
+    """
+    rng = random.Random(seed)
+    words, weights = _vocabulary(rng)
+    names = [word.capitalize() for word in words[:2000]]
+    journals = [f"Journal of {' '.join(rng.choices(names, k=rng.randint(1, 3)))}" for _ in range(300)]
+    duplicates = int(n * DUPLICATE_RATE)
+
+    works = []
+    for i in range(n - duplicates):
+        title = ' '.join(rng.choices(words, weights, k=rng.randint(6, 16))).capitalize()
+        authors = [f"{rng.choice(names)} {rng.choice(names)}" for _ in range(rng.randint(1, 12))]
+        if rng.random() < 0.4:
+            authors.insert(rng.randrange(len(authors) + 1), HIGHLIGHT_NAME)
+        entry = {
+            'ENTRYTYPE': 'article' if rng.random() < 0.85 else 'inproceedings',
+            'ID': f"{authors[0].split()[-1].lower()}{i}",
+            'title': title,
+            'author': ' and '.join(authors),
+            'year': str(min(2026, int(rng.triangular(1995, 2027, 2024)))),
+            'doi': f"10.{rng.randint(1000, 99999)}/{rng.choice(words)}.{i}",
+        }
+        entry['journal' if entry['ENTRYTYPE'] == 'article' else 'booktitle'] = rng.choice(journals)
+        works.append(entry)
+
+    # Each duplicate goes somewhere after its work; the BibTeX reader keeps the
+    # first of two entries with the same title, which should be the complete one
+    following: List[List[Dict]] = [[] for _ in works]
+    for i in range(duplicates):
+        original = rng.randrange(len(works))
+        entry = dict(works[original], ID=f"dup{i}")
+        entry['title'] = _title_variant(rng, entry['title'])
+        if rng.random() < MISSING_DOI_RATE:
+            if rng.random() < 0.5:
+                entry['doi'] = '"none"'
+            else:
+                del entry['doi']
+        else:
+            entry['doi'] = entry['doi'].upper()
+        following[rng.randrange(original, len(works))].append(entry)
+    return [entry for work, after in zip(works, following) for entry in (work, *after)]
+
+def bibtex_text(entries: List[Dict]) -> str:
+    """Write entries as BibTeX."""
+    blocks = []
+    for entry in entries:
+        fields = [f"  {name}={{{value}}}" for name, value in entry.items() if name not in ('ENTRYTYPE', 'ID')]
+        blocks.append(f"@{entry['ENTRYTYPE']}{{{entry['ID']},\n" + ",\n".join(fields) + "\n}\n")
+    return "\n".join(blocks)
+
+def orcid_publications(entries: List[Dict], seed: int = 0) -> List[Dict]:
+    """Publications a second source reports for ``ORCID_RATE`` of the works with a DOI."""
+    rng = random.Random(seed + 1)
+    pubs = []
+    for entry in entries:
+        doi = entry.get('doi', '')
+        if doi.startswith('10.') and rng.random() < ORCID_RATE:
+            pubs.append(dict(bibtex_entry_to_pub(entry), source='orcid',
+                             title=_title_variant(rng, entry['title'])))
+    return pubs
+
+def synthetic_repos(n: int, seed: int = 0) -> List[Dict]:
+    """Generate ``n`` repository records as the fetchers return them."""
+    rng = random.Random(seed)
+    words, weights = _vocabulary(rng, 2000)
+    languages = list(LANGUAGE_ICONS) + ['Unknown']
+    repos = []
+    for i in range(n):
+        name = '-'.join(rng.choices(words, weights, k=rng.randint(1, 3))) + str(i)
+        source = 'github' if rng.random() < 0.9 else 'gitlab'
+        host = 'https://github.com' if source == 'github' else BENCH_GITLAB_INSTANCE
+        repos.append({
+            'name': name,
+            'description': ' '.join(rng.choices(words, weights, k=rng.randint(0, 20))).capitalize(),
+            'url': f"{host}/owner{i % 50}/{name}",
+            'language': rng.choice(languages),
+            'stars': int(rng.paretovariate(1.2)) - 1,
+            'forks': int(rng.paretovariate(1.5)) - 1,
+            'updated_at': f"{rng.randint(2015, 2026)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+            'topics': rng.sample(words[:200], rng.randint(0, 6)),
+            'source': source,
+        })
+    return repos
+
+# Function benchmarks, set up and timed in a child process
+
+def _merge_inputs(size: int, seed: int) -> List[List[Dict]]:
+    entries = synthetic_entries(size, seed)
+    return [[bibtex_entry_to_pub(entry) for entry in entries], orcid_publications(entries, seed)]
+
+class OfflineCrossref:
+    """Crossref client that knows no works, answering without network."""
+
+    mailto = None
+
+    def works(self, **kwargs) -> Dict:
+        return {'message': {'items': []}}
+
+def _offline_merge(pubs_list: List[List[Dict]], workdir: Path) -> Callable[[], List[Dict]]:
+    """Merge ``pubs_list`` with every title search of the run already cached as empty."""
+    cache = CrossrefCache(workdir / "crossref.sqlite")
+    for pubs in pubs_list:
+        for pub in pubs:
+            if not pub.get('doi') and pub.get('title'):
+                cache.put_search(pub['title'], [])
+    return lambda: merge_publications(pubs_list, OfflineCrossref(), cache)
+
+def _setup_get_bibtex_works(size: int, seed: int, workdir: Path) -> Callable[[], Any]:
+    path = workdir / "pubs.bib"
+    path.write_text(bibtex_text(synthetic_entries(size, seed)), encoding='utf-8')
+    return lambda: get_bibtex_works(str(path))
+
+def _setup_merge_publications(size: int, seed: int, workdir: Path) -> Callable[[], Any]:
+    return _offline_merge(_merge_inputs(size, seed), workdir)
+
+def _setup_merge_frames(size: int, seed: int, workdir: Path) -> Callable[[], Any]:
+    # The grouping alone, from the per-source frames, without Crossref supplementation
+    frames = [publications_frame(pubs, index) for index, pubs in enumerate(_merge_inputs(size, seed))]
+    return lambda: _merge_frames(frames)
+
+def _setup_generate_publications_page(size: int, seed: int, workdir: Path) -> Callable[[], Any]:
+    pubs = _offline_merge(_merge_inputs(size, seed), workdir)()
+    return lambda: generate_publications_page(pubs, HIGHLIGHT_NAME)
+
+def _setup_format_publication(size: int, seed: int, workdir: Path) -> Callable[[], Any]:
+    pubs = _offline_merge(_merge_inputs(size, seed), workdir)()
+    return lambda: [format_publication(pub, HIGHLIGHT_NAME) for pub in pubs]
+
+def _setup_generate_software_page(size: int, seed: int, workdir: Path) -> Callable[[], Any]:
+    repos = synthetic_repos(size, seed)
+    return lambda: generate_software_page(repos)
+
+def _max_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    usage = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage / (1 << 20) if sys.platform == 'darwin' else usage / 1024
+
+def run_function_case(name: str, size: int, repeat: int, seed: int) -> Dict:
+    """Set up and time one function benchmark; meant to run in a fresh process."""
+    logging.getLogger().setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        function = CASES[name].setup(size, seed, Path(tmp))
+        rss_before = _max_rss_mb()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+            if times[-1] > LONG_RUN_SECONDS:
+                break
+    peak = _max_rss_mb()
+    return {
+        'seconds': min(times),
+        'mean_seconds': sum(times) / len(times),
+        'throughput': size / max(min(times), 1e-9),
+        'peak_rss_mb': peak,
+        'rss_growth_mb': peak - rss_before,
+    }
+
+# End-to-end benchmarks: the scripts against synthetic API answers
+
+def _json_fixture(store: FixtureStore, url: str, data: Any, accept: str = 'application/json',
+                  headers: Optional[Dict[str, str]] = None) -> None:
+    body = json.dumps(data)
+    store.add('GET', url, body, headers={'Content-Type': 'application/json', 'ETag': f'"{text_hash(body)[:16]}"',
+                                         **(headers or {})}, accept=accept)
+
+def _setup_update_publications(size: int, seed: int, workdir: Path) -> List[str]:
+    entries = synthetic_entries(size, seed)
+    (workdir / "pubs.bib").write_text(bibtex_text(entries), encoding='utf-8')
+
+    # ORCID lists a share of the works; summaries first, then bulk records
+    store = FixtureStore(workdir / "fixtures")
+    base = f"https://pub.orcid.org/v3.0/{BENCH_ORCID}/works"
+    works = []
+    for put_code, pub in enumerate(orcid_publications(entries, seed), start=1):
+        works.append({
+            'put-code': put_code,
+            'type': 'journal-article',
+            'title': {'title': {'value': pub['title']}},
+            'publication-date': {'year': {'value': pub['year']}},
+            'external-ids': {'external-id': [{'external-id-type': 'doi', 'external-id-value': pub['doi']}]},
+            'journal-title': {'value': pub['journal']},
+            'contributors': {'contributor': [{'credit-name': {'value': name}} for name in pub['author']]},
+        })
+    _json_fixture(store, base, {'group': [{'work-summary': [work]} for work in works]})
+    for start in range(0, len(works), ORCID_BULK_SIZE):
+        batch = works[start:start + ORCID_BULK_SIZE]
+        _json_fixture(store, f"{base}/{','.join(str(work['put-code']) for work in batch)}",
+                      {'bulk': [{'work': work} for work in batch]})
+    return ['--bibtex', 'pubs.bib', '--orcid', BENCH_ORCID, '--output', 'publications.md',
+            '--raw-output', 'publications.json']
+
+def _setup_update_software(size: int, seed: int, workdir: Path) -> List[str]:
+    repos = synthetic_repos(size, seed)
+    store = FixtureStore(workdir / "fixtures")
+
+    def github_repo(owner: str, repo: Dict) -> Dict:
+        return {'name': repo['name'], 'description': repo['description'],
+                'html_url': f"https://github.com/{owner}/{repo['name']}", 'language': repo['language'],
+                'stargazers_count': repo['stars'], 'forks_count': repo['forks'],
+                'updated_at': repo['updated_at'], 'topics': repo['topics'], 'fork': False}
+
+    def github_listing(owner: str, owned: List[Dict]) -> None:
+        _json_fixture(store, f"https://api.github.com/users/{owner}/repos?page=1&per_page=100",
+                      [github_repo(owner, repo) for repo in owned], GITHUB_ACCEPT)
+
+    # The URL list names repositories of owners with many of them, listed
+    # once per owner; a few are on GitLab and looked up one by one
+    gitlab = [repo for repo in repos if repo['source'] == 'gitlab'][:20]
+    on_gitlab = {repo['url'] for repo in gitlab}
+    github = [repo for repo in repos if repo['url'] not in on_gitlab]
+    urls = []
+    for start in range(0, len(github), REPOS_PER_OWNER):
+        owner = f"owner{start // REPOS_PER_OWNER}"
+        owned = github[start:start + REPOS_PER_OWNER]
+        if len(owned) == 1:
+            # A single repository of an owner is fetched directly instead of listed
+            _json_fixture(store, f"https://api.github.com/repos/{owner}/{owned[0]['name']}",
+                          github_repo(owner, owned[0]), GITHUB_ACCEPT)
+        else:
+            github_listing(owner, owned)
+        urls.extend(f"https://github.com/{owner}/{repo['name']}" for repo in owned)
+    for i, repo in enumerate(gitlab):
+        path = f"group{i}/{repo['name']}"
+        project = {'name': repo['name'], 'description': repo['description'], 'language': repo['language'],
+                   'web_url': f"{BENCH_GITLAB_INSTANCE}/{path}", 'star_count': repo['stars'],
+                   'forks_count': repo['forks'], 'last_activity_at': repo['updated_at'], 'topics': repo['topics']}
+        _json_fixture(store, f"{BENCH_GITLAB_INSTANCE}/api/v4/projects/{requests.utils.quote(path, safe='')}", project)
+        urls.append(f"{BENCH_GITLAB_INSTANCE}/{path}")
+    (workdir / "repos.lst").write_text("\n".join(urls) + "\n")
+
+    # The user's own listings: a page of GitHub repositories, no GitLab projects
+    github_listing(BENCH_GITHUB_USER, github[:REPOS_PER_OWNER])
+    _json_fixture(store, f"{BENCH_GITLAB_INSTANCE}/api/v4/users?username={BENCH_GITLAB_USER}", [{'id': 1}])
+    _json_fixture(store, f"{BENCH_GITLAB_INSTANCE}/api/v4/users/1/projects?visibility=public&pagination=keyset"
+                         f"&order_by=id&sort=asc&per_page=100", [])
+    return ['--github-user', BENCH_GITHUB_USER, '--gitlab-instance', BENCH_GITLAB_INSTANCE,
+            '--gitlab-user', BENCH_GITLAB_USER, '--from-file', 'repos.lst', '--output', 'software.md',
+            '--raw-output', 'software.json']
+
+def _run_script(script: str, args: List[str], workdir: Path) -> Tuple[float, float, Dict]:
+    """Run an update script in ``workdir`` and measure it.
+
+    Returns:
+        Tuple of (wall seconds, peak RSS in MB, the script's ``--profile`` report)
+    """
+    report_path = workdir / "profile.json"
+    command = [sys.executable, str(SCRIPTS_DIR / script), *args, '--quiet', '--profile', str(report_path)]
+    with open(workdir / "stderr.log", 'w') as stderr:
+        start = time.perf_counter()
+        process = subprocess.run(command, cwd=workdir, stdout=subprocess.DEVNULL, stderr=stderr)
+        seconds = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"{script} failed:\n{(workdir / 'stderr.log').read_text()[-2000:]}")
+    # The peak of every child waited for so far: the cold run is the first one
+    return seconds, _max_rss_mb(resource.RUSAGE_CHILDREN), json.loads(report_path.read_text())
+
+def run_end_to_end_case(name: str, size: int, seed: int, latency: float) -> Dict:
+    """Run an update script twice on synthetic inputs: cold, then with the first run's caches.
+
+    Meant to run in a fresh process, so the peak RSS of the cold run is its own.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        args = CASES[name].setup(size, seed, workdir) + ['--replay', 'fixtures', '--replay-latency', str(latency)]
+        seconds, rss, report = _run_script(f"{name}.py", args, workdir)
+        warm_seconds, _, warm_report = _run_script(f"{name}.py", args, workdir)
+    return {
+        'seconds': seconds,
+        'warm_seconds': warm_seconds,
+        'throughput': size / seconds,
+        'peak_rss_mb': rss,
+        'stages': {stage: entry['seconds'] for stage, entry in report['stages'].items()},
+        'warm_stages': {stage: entry['seconds'] for stage, entry in warm_report['stages'].items()},
+    }
+
+CASES: Dict[str, Case] = {
+    'get_bibtex_works': Case(BIBTEX_SIZES, 'entries', _setup_get_bibtex_works),
+    'merge_publications': Case(BIBTEX_SIZES, 'entries', _setup_merge_publications),
+    'merge_frames': Case(MERGE_SIZES, 'entries', _setup_merge_frames),
+    'generate_publications_page': Case(BIBTEX_SIZES, 'entries', _setup_generate_publications_page),
+    'format_publication': Case(BIBTEX_SIZES, 'entries', _setup_format_publication),
+    'generate_software_page': Case(REPO_SIZES, 'repos', _setup_generate_software_page),
+    'update_publications': Case(BIBTEX_SIZES, 'entries', _setup_update_publications, end_to_end=True),
+    'update_software': Case(REPO_SIZES, 'URLs', _setup_update_software, end_to_end=True),
+}
+
+# Reporting
+
+def scaling_exponents(results: Dict[str, Dict]) -> Dict[str, Optional[float]]:
+    """Log-log slope of the time between each size and the previous one (1 = linear)."""
+    exponents: Dict[str, Optional[float]] = {}
+    previous = None
+    for size, result in sorted(results.items(), key=lambda item: int(item[0])):
+        if previous and previous[1] > 0 and result['seconds'] > 0:
+            exponents[size] = math.log(result['seconds'] / previous[1]) / math.log(int(size) / previous[0])
+        else:
+            exponents[size] = None
+        previous = (int(size), result['seconds'])
+    return exponents
+
+def log_case(name: str, results: Dict[str, Dict]) -> None:
+    """Log a case's results as a table, one line per size."""
+    unit = CASES[name].unit
+    log.info("%s", name)
+    log.info("  %8s %10s %14s %10s %11s %8s", 'size', 'seconds', f'{unit}/s', 'peak RSS', 'warm', 'scaling')
+    exponents = scaling_exponents(results)
+    for size, result in sorted(results.items(), key=lambda item: int(item[0])):
+        warm = f"{result['warm_seconds']:.3f}s" if 'warm_seconds' in result else '-'
+        exponent = f"{exponents[size]:.2f}" if exponents[size] is not None else '-'
+        log.info("  %8s %9.3fs %14.0f %8.0fMB %11s %8s", size, result['seconds'], result['throughput'],
+                 result['peak_rss_mb'], warm, exponent)
+
+def compare(results: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """List the timings that got slower than the baseline by more than ``tolerance``."""
+    regressions = []
+    for name, sizes in results['cases'].items():
+        for size, result in sizes.items():
+            old = baseline.get('cases', {}).get(name, {}).get(size)
+            if not old:
+                continue
+            for metric in COMPARED_METRICS:
+                if metric not in result or metric not in old:
+                    continue
+                new_seconds, old_seconds = result[metric], old[metric]
+                if new_seconds > old_seconds * (1 + tolerance) and new_seconds - old_seconds > MIN_REGRESSION_SECONDS:
+                    regressions.append(f"{name} [{size}] {metric}: {old_seconds:.3f}s -> {new_seconds:.3f}s "
+                                       f"({new_seconds / old_seconds - 1:+.0%})")
+    return regressions
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the publications and software pipelines on synthetic inputs",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=list(CASES),
+        default=list(CASES),
+        help="Benchmarks to run"
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=None,
+        help="Skip input sizes above this"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Runs of each function benchmark; the best one counts"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the synthetic inputs"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds of latency injected into every API answer of the end-to-end runs"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_RESULTS,
+        help="Where to write the results as JSON"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Results to compare against"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Slowdown relative to the baseline reported as a regression"
+    )
+    return parser.parse_args()
+
+def main():
+    """Main function."""
+    args = parse_args()
+    instrumentation.configure_logging()
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cases': {},
+    }
+    # A fresh interpreter per benchmark keeps peak RSS and warm-up separate
+    context = multiprocessing.get_context('spawn')
+    for name in args.cases:
+        case = CASES[name]
+        sizes = [size for size in case.sizes if args.max_size is None or size <= args.max_size]
+        case_results = results['cases'][name] = {}
+        for size in sizes:
+            log.debug("Running %s with %d %s", name, size, case.unit)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                if case.end_to_end:
+                    future = executor.submit(run_end_to_end_case, name, size, args.seed, args.latency)
+                else:
+                    future = executor.submit(run_function_case, name, size, args.repeat, args.seed)
+                case_results[str(size)] = future.result()
+        for size, exponent in scaling_exponents(case_results).items():
+            case_results[size]['scaling'] = exponent
+        log_case(name, case_results)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    log.info("Results written to %s", args.output)
+
+    regressions = []
+    if args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            log.warning("Regression: %s", regression)
+        if not regressions:
+            log.info("No regressions against %s", args.baseline)
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2))
+        log.info("Baseline written to %s", args.baseline)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
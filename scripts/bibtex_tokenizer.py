@@ -0,0 +1,207 @@
+"""Fallback BibTeX parser for entries bibtexparser cannot read.
+
+A hand-written scanner that tracks brace depth, so field values with nested
+braces are read whole, and that walks the text once from left to right. When
+an entry is malformed it is reported as skipped and scanning resumes at the
+next ``@`` that starts a line, so one bad entry never takes the rest of the
+file down with it.
+"""
+from typing import Dict, Iterator, List, NamedTuple, Tuple, Union
+import re
+
+# Entry types whose body is not a list of fields
+NON_FIELD_TYPES = {'comment', 'preamble', 'string'}
+
+_NAME = re.compile(r'[^\s{}(),=#"]+')
+_WHITESPACE = re.compile(r'\s+')
+_FIELD_START = re.compile(r'\s*[^\s{}(),=#"]+\s*=')
+_ENTRY_START = re.compile(r'^[ \t]*@', re.MULTILINE)
+# Characters that matter inside braced / quoted values: escapes are skipped as
+# a pair, and an ``@`` starting a line ends a value that was never closed
+_BRACED_SPECIAL = re.compile(r'\\.|[{}]|^[ \t]*@', re.MULTILINE | re.DOTALL)
+_QUOTED_SPECIAL = re.compile(r'\\.|[{}"]|^[ \t]*@', re.MULTILINE | re.DOTALL)
+
+class SkippedEntry(NamedTuple):
+    """An entry the tokenizer could not parse."""
+    key: str
+    line: int
+    reason: str
+
+class BibtexSyntaxError(ValueError):
+    """Raised inside the scanner when an entry is malformed."""
+
+    def __init__(self, reason: str, pos: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.pos = pos
+
+class _Scanner:
+    """Cursor over BibTeX text; every method only moves forward."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def skip_space(self) -> None:
+        match = _WHITESPACE.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ''
+
+    def expect(self, chars: str) -> str:
+        self.skip_space()
+        char = self.peek()
+        if not char or char not in chars:
+            raise BibtexSyntaxError(f"expected one of {chars!r}, found {char or 'end of file'!r}", self.pos)
+        self.pos += 1
+        return char
+
+    def name(self) -> str:
+        self.skip_space()
+        match = _NAME.match(self.text, self.pos)
+        if not match:
+            raise BibtexSyntaxError("expected a name", self.pos)
+        self.pos = match.end()
+        return match.group(0)
+
+    def braced(self) -> str:
+        """Read a ``{...}`` value, with the cursor on the opening brace."""
+        start = self.pos + 1
+        depth = 0
+        text = self.text
+        for match in _BRACED_SPECIAL.finditer(text, self.pos):
+            char = match.group(0)
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    self.pos = match.end()
+                    return text[start:match.start()]
+            elif char[-1] == '@':
+                # An entry starting inside a value means this brace was never closed
+                break
+        raise BibtexSyntaxError("unbalanced braces", self.pos)
+
+    def quoted(self) -> str:
+        """Read a ``"..."`` value, with the cursor on the opening quote."""
+        start = self.pos + 1
+        depth = 0
+        text = self.text
+        for match in _QUOTED_SPECIAL.finditer(text, start):
+            char = match.group(0)
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            elif char == '"' and depth == 0:
+                self.pos = match.end()
+                return text[start:match.start()]
+            elif char[-1] == '@':
+                break
+        raise BibtexSyntaxError("unterminated quoted value", self.pos)
+
+    def value(self) -> str:
+        """Read a field value: braced, quoted or bare parts joined with ``#``."""
+        parts = []
+        while True:
+            self.skip_space()
+            char = self.peek()
+            if char == '{':
+                parts.append(self.braced())
+            elif char == '"':
+                parts.append(self.quoted())
+            else:
+                parts.append(self.name())
+            self.skip_space()
+            if self.peek() != '#':
+                return ''.join(parts)
+            self.pos += 1
+
+def clean_value(value: str) -> str:
+    """Drop grouping braces and collapse whitespace, as bibtexparser's unicode conversion does."""
+    value = re.sub(r'(?<!\\)[{}]', '', value)
+    return _WHITESPACE.sub(' ', value).strip()
+
+class _LineCounter:
+    """Maps positions to line numbers, counting newlines only once as positions grow."""
+
+    def __init__(self, text: str, first_line: int):
+        self.text = text
+        self.pos = 0
+        self.line = first_line
+
+    def line_of(self, pos: int) -> int:
+        if pos < self.pos:
+            return self.line - self.text.count('\n', pos, self.pos)
+        self.line += self.text.count('\n', self.pos, pos)
+        self.pos = pos
+        return self.line
+
+def _next_entry(text: str, pos: int) -> int:
+    """Find the next ``@`` at the start of a line after ``pos``, or the end of the text."""
+    match = _ENTRY_START.search(text, pos)
+    return match.end() - 1 if match else len(text)
+
+def iter_bibtex(text: str, first_line: int = 1) -> Iterator[Union[Dict, SkippedEntry]]:
+    """Parse BibTeX text in one pass, yielding entries and skipped-entry reports.
+
+    Args:
+        text: BibTeX text
+        first_line: Line number of the first line of ``text``, for reports
+
+    Returns:
+        Iterator over entry dictionaries (with ``ENTRYTYPE`` and ``ID`` like
+        bibtexparser's, field names lowercased) and ``SkippedEntry`` records
+    """
+    scanner = _Scanner(text)
+    lines = _LineCounter(text, first_line)
+    while True:
+        at = text.find('@', scanner.pos)
+        if at < 0:
+            return
+        scanner.pos = at + 1
+        key = ''
+        try:
+            entry_type = scanner.name().lower()
+            close = '}' if scanner.expect('{(') == '{' else ')'
+            if entry_type in NON_FIELD_TYPES:
+                # Skip the body; braces inside it still have to balance
+                scanner.pos -= 1
+                if close == '}':
+                    scanner.braced()
+                else:
+                    scanner.pos = text.index(')', scanner.pos) + 1
+                continue
+
+            key = scanner.name()
+            entry = {'ENTRYTYPE': entry_type, 'ID': key}
+            while True:
+                if len(entry) > 2 and _FIELD_START.match(text, scanner.pos):
+                    separator = ','  # Tolerate a missing comma between two fields
+                else:
+                    separator = scanner.expect(',' + close)
+                scanner.skip_space()
+                if separator == close or scanner.peek() == close:
+                    if scanner.peek() == close:
+                        scanner.pos += 1
+                    break
+                field = scanner.name().lower()
+                scanner.expect('=')
+                entry[field] = clean_value(scanner.value())
+            yield entry
+        except (BibtexSyntaxError, ValueError) as e:
+            reason = e.reason if isinstance(e, BibtexSyntaxError) else str(e)
+            error_pos = e.pos if isinstance(e, BibtexSyntaxError) else scanner.pos
+            entry_line = lines.line_of(at)
+            yield SkippedEntry(key or '?', entry_line, f"{reason} (line {lines.line_of(error_pos)})")
+            scanner.pos = _next_entry(text, max(error_pos, at + 1))
+
+def parse_bibtex(text: str, first_line: int = 1) -> Tuple[List[Dict], List[SkippedEntry]]:
+    """Parse BibTeX text, returning the entries and the entries that had to be skipped."""
+    entries, skipped = [], []
+    for item in iter_bibtex(text, first_line):
+        (skipped if isinstance(item, SkippedEntry) else entries).append(item)
+    return entries, skipped
@@ -0,0 +1,145 @@
+"""Persistent cache of Crossref lookups for the publications script.
+
+Published metadata almost never changes, so work records fetched by DOI and
+the result lists of title searches are kept in a small SQLite database and
+reused across runs until their TTL runs out. A third table maps canonical
+titles of known works to their DOIs, for answering title lookups locally.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from pathlib import Path
+from threading import Lock
+import json
+import re
+import sqlite3
+import time
+
+DEFAULT_CACHE_PATH = Path(".cache/crossref.sqlite")
+# Seconds a cached work record / title search result stays valid
+DEFAULT_WORK_TTL = 90 * 24 * 3600
+DEFAULT_SEARCH_TTL = 30 * 24 * 3600
+# Seconds a DOI that Crossref does not know is remembered as missing
+DEFAULT_MISS_TTL = 7 * 24 * 3600
+
+# Sentinel returned by get_work for a DOI cached as not found
+MISSING = {}
+
+def normalize_doi(doi: str) -> str:
+    """Normalize a DOI for use as a cache key (lowercase, no resolver prefix or quotes)."""
+    doi = doi.strip().strip('"').strip()
+    doi = re.sub(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', '', doi, flags=re.IGNORECASE)
+    return doi.lower()
+
+def normalize_query(query: str) -> str:
+    """Normalize a title search query for use as a cache key."""
+    return ' '.join(query.lower().split())
+
+class CrossrefCache:
+    """SQLite-backed cache of Crossref work records and title search results."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_CACHE_PATH, work_ttl: float = DEFAULT_WORK_TTL,
+                 search_ttl: float = DEFAULT_SEARCH_TTL, miss_ttl: float = DEFAULT_MISS_TTL):
+        self.path = Path(path)
+        self.work_ttl = work_ttl
+        self.search_ttl = search_ttl
+        self.miss_ttl = miss_ttl
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS works (doi TEXT PRIMARY KEY, record TEXT, fetched_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS searches (query TEXT PRIMARY KEY, items TEXT, fetched_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS titles (title TEXT PRIMARY KEY, doi TEXT)"
+            )
+
+    def count(self, hit: bool) -> None:
+        """Count a hit or a miss; the cache is shared by the Crossref worker threads."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _get(self, table: str, key_column: str, key: str, value_column: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {value_column}, fetched_at FROM {table} WHERE {key_column} = ?", (key,)
+            ).fetchone()
+        if row is None:
+            self.count(hit=False)
+        return row
+
+    def _put(self, table: str, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)", (key, value, time.time()))
+
+    def get_work(self, doi: str) -> Optional[Dict]:
+        """Get the cached work record for a DOI.
+
+        Returns:
+            The record, ``MISSING`` if the DOI is cached as unknown to Crossref,
+            or None if there is no valid cache entry
+        """
+        row = self._get('works', 'doi', normalize_doi(doi), 'record')
+        if row is None:
+            return None
+        record, fetched_at = row
+        ttl = self.work_ttl if record is not None else self.miss_ttl
+        if time.time() - fetched_at > ttl:
+            self.count(hit=False)
+            return None
+        self.count(hit=True)
+        return json.loads(record) if record is not None else MISSING
+
+    def put_work(self, doi: str, record: Optional[Dict]) -> None:
+        """Cache a work record; a record of None marks the DOI as not found."""
+        self._put('works', normalize_doi(doi), json.dumps(record) if record is not None else None)
+
+    def get_search(self, query: str) -> Optional[List[Dict]]:
+        """Get the cached result items of a title search, or None if not cached."""
+        row = self._get('searches', 'query', normalize_query(query), 'items')
+        if row is None:
+            return None
+        items, fetched_at = row
+        if time.time() - fetched_at > self.search_ttl:
+            self.count(hit=False)
+            return None
+        self.count(hit=True)
+        return json.loads(items)
+
+    def put_search(self, query: str, items: List[Dict]) -> None:
+        """Cache the result items of a title search."""
+        self._put('searches', normalize_query(query), json.dumps(items))
+
+    def get_titles(self) -> List[Tuple[str, str]]:
+        """Get every stored (canonical title, DOI) pair."""
+        with self._lock:
+            return self._conn.execute("SELECT title, doi FROM titles").fetchall()
+
+    def put_titles(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Store (canonical title, DOI) pairs, keeping the DOI already stored for a title."""
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO titles VALUES (?, ?)", pairs)
+
+    def invalidate(self, doi: Optional[str] = None, query: Optional[str] = None) -> None:
+        """Drop one DOI and/or search entry, or everything when neither is given."""
+        with self._lock, self._conn:
+            if doi is None and query is None:
+                self._conn.execute("DELETE FROM works")
+                self._conn.execute("DELETE FROM searches")
+                self._conn.execute("DELETE FROM titles")
+            if doi is not None:
+                self._conn.execute("DELETE FROM works WHERE doi = ?", (normalize_doi(doi),))
+            if query is not None:
+                self._conn.execute("DELETE FROM searches WHERE query = ?", (normalize_query(query),))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,269 @@
+"""Shared HTTP client for the update scripts.
+
+Keeps one pooled ``requests.Session`` per host so repeated API calls reuse
+the same keep-alive connections instead of doing a new TCP+TLS handshake
+each time, applies a default connect/read timeout to every request and
+reports each request's host, status and latency to ``instrumentation``.
+A ``rate_limit.RequestScheduler`` can be configured to pace requests by the
+quota the APIs report and to retry throttled ones, and ``configure_replay``
+sends all traffic to an ``http_replay`` server instead of the real hosts.
+
+``cached_get`` adds an on-disk cache of GET responses that revalidates with
+``If-None-Match`` / ``If-Modified-Since``, so unchanged API resources come
+back as cheap 304s (which GitHub does not count against the rate limit).
+"""
+from typing import Dict, Optional, Tuple, Union
+from pathlib import Path
+from threading import Lock
+from urllib.parse import urlparse
+import hashlib
+import json
+import os
+import time
+import requests
+import instrumentation
+from rate_limit import RequestScheduler
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# (connect, read) timeout in seconds applied when the caller gives none
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 30.0)
+
+# Connections kept open per host; should cover the scripts' worker counts
+POOL_MAXSIZE = 16
+
+# Response cache defaults: entries older than the TTL are dropped instead of revalidated
+DEFAULT_CACHE_DIR = Path(".cache/http")
+DEFAULT_CACHE_TTL = 7 * 24 * 3600
+DEFAULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Response headers kept in the cache (callers read Link for pagination)
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link', 'X-Total-Pages', 'X-Next-Page')
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = Lock()
+_scheduler: Optional[RequestScheduler] = None
+# Base URL of an ``http_replay`` server standing in for every API host
+_replay_base: Optional[str] = None
+
+def _host_key(url: str) -> str:
+    """Get the scheme://host key a URL's session is stored under."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+def get_session(url: str) -> requests.Session:
+    """Get the pooled session for a URL's host, creating it on first use."""
+    key = _host_key(url)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            session.mount(f"{urlparse(key).scheme}://", adapter)
+            session.headers.update({
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive',
+            })
+            _sessions[key] = session
+        return session
+
+def request(method: str, url: str, timeout: Optional[Union[float, Tuple[float, float]]] = None,
+            **kwargs) -> requests.Response:
+    """Send a request through the host's pooled session.
+
+    With a scheduler configured, the request waits for its host's rate limit
+    and is retried while the host is throttling or failing.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        timeout: (connect, read) timeout; defaults to ``DEFAULT_TIMEOUT``
+        **kwargs: Passed through to ``requests.Session.request``
+
+    Returns:
+        The response
+    """
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+    if _scheduler is None:
+        return _send(method, url, timeout, **kwargs)
+    return _scheduler.send(urlparse(url).netloc.lower(), lambda: _send(method, url, timeout, **kwargs))
+
+def _send(method: str, url: str, timeout: Union[float, Tuple[float, float]], **kwargs) -> requests.Response:
+    target = replay_url(url)
+    start = time.perf_counter()
+    status = None
+    try:
+        response = get_session(target).request(method, target, timeout=timeout, **kwargs)
+        status = response.status_code
+        return response
+    finally:
+        instrumentation.record_request(urlparse(url).netloc.lower(), time.perf_counter() - start, status)
+
+def configure_scheduler(scheduler: Optional[RequestScheduler]) -> None:
+    """Route every request through a rate-limit-aware scheduler; None sends requests directly."""
+    global _scheduler
+    _scheduler = scheduler
+
+def configure_replay(base_url: Optional[str]) -> None:
+    """Send every request to an ``http_replay`` server at ``base_url``; None sends them to the real hosts."""
+    global _replay_base
+    _replay_base = base_url.rstrip('/') if base_url else None
+
+def replay_url(url: str) -> str:
+    """Map a URL to its address on the replay server, or return it unchanged when none is configured."""
+    if _replay_base is None:
+        return url
+    parsed = urlparse(url)
+    return f"{_replay_base}/{parsed.netloc}{parsed.path}" + (f"?{parsed.query}" if parsed.query else '')
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Send a GET request through the host's pooled session."""
+    return request('GET', url, **kwargs)
+
+def close_sessions() -> None:
+    """Close every pooled session."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+class ResponseCache:
+    """On-disk cache of GET responses, validated with ETag / Last-Modified.
+
+    Each entry is a JSON file named after the hash of the request URL and
+    ``Accept`` header. Entries not stored or revalidated within ``ttl``
+    seconds are discarded, and ``prune`` removes the least recently used
+    entries once the cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_CACHE_TTL,
+                 max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str, accept: str) -> Path:
+        digest = hashlib.sha256(f"{accept}\n{url}".encode('utf-8')).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def count(self, hit: bool) -> None:
+        """Count a hit or a miss; ``cached_get`` is called from several threads."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def load(self, url: str, accept: str = '') -> Optional[Dict]:
+        """Load the cached entry for a URL, or None if missing or expired."""
+        path = self._path(url, accept)
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('stored_at', 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def store(self, url: str, accept: str, response: requests.Response) -> None:
+        """Store a 200 response that carries a validator."""
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        if 'ETag' not in headers and 'Last-Modified' not in headers:
+            return
+        entry = {
+            'url': url,
+            'stored_at': time.time(),
+            'headers': headers,
+            'body': response.text,
+        }
+        self._write(self._path(url, accept), entry)
+
+    def touch(self, url: str, accept: str, entry: Dict) -> None:
+        """Mark an entry as revalidated by a 304 response."""
+        entry['stored_at'] = time.time()
+        self._write(self._path(url, accept), entry)
+
+    def _write(self, path: Path, entry: Dict) -> None:
+        tmp = path.with_suffix(f".{os.getpid()}.{id(entry)}.tmp")
+        tmp.write_text(json.dumps(entry), encoding='utf-8')
+        os.replace(tmp, path)
+
+    def prune(self) -> None:
+        """Drop expired entries, then the least recently used ones over ``max_bytes``."""
+        now = time.time()
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+_cache: Optional[ResponseCache] = None
+
+def configure_cache(directory: Optional[Union[str, Path]] = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_CACHE_TTL,
+                    max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> Optional[ResponseCache]:
+    """Enable the response cache used by ``cached_get``; a ``directory`` of None disables it."""
+    global _cache
+    _cache = ResponseCache(directory, ttl, max_bytes) if directory is not None else None
+    return _cache
+
+def get_cache() -> Optional[ResponseCache]:
+    """Get the configured response cache, if any."""
+    return _cache
+
+def _cached_response(url: str, entry: Dict) -> requests.Response:
+    """Rebuild a 200 response from a cache entry."""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response._content = entry['body'].encode('utf-8')
+    response.encoding = 'utf-8'
+    return response
+
+def cached_get(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+               **kwargs) -> requests.Response:
+    """GET through the response cache, using a conditional request when an entry exists.
+
+    Without a configured cache this is a plain ``get``. A 304 answer is
+    turned into a 200 response carrying the cached body and headers, so
+    callers can treat both cases the same way.
+    """
+    if _cache is None:
+        return get(url, params=params, headers=headers, **kwargs)
+
+    full_url = requests.Request('GET', url, params=params).prepare().url
+    headers = dict(headers or {})
+    accept = headers.get('Accept', '')
+    entry = _cache.load(full_url, accept)
+    if entry:
+        if 'ETag' in entry['headers']:
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if 'Last-Modified' in entry['headers']:
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+
+    response = get(full_url, headers=headers, **kwargs)
+    if response.status_code == 304 and entry:
+        _cache.count(hit=True)
+        _cache.touch(full_url, accept, entry)
+        return _cached_response(full_url, entry)
+    _cache.count(hit=False)
+    if response.status_code == 200:
+        _cache.store(full_url, accept, response)
+    return response
@@ -0,0 +1,318 @@
+"""Record and replay the API traffic of the update scripts.
+
+A small local HTTP server stands in for GitHub, GitLab, ORCID and Crossref.
+Clients send ``https://api.github.com/users/x`` to
+``http://127.0.0.1:PORT/api.github.com/users/x`` instead (``http_client``
+rewrites its URLs and the Crossref client gets the server as its base URL),
+so the server sees every exchange whatever HTTP library made it.
+
+In record mode the server forwards each request to the real host and stores
+the response as a JSON fixture; in replay mode it answers from the fixtures
+only, optionally with injected latency and a per-host rate limit announced
+through the same headers the real APIs send. Credentials are forwarded when
+recording but never written to the fixtures.
+
+The scripts start the server with their ``--record`` / ``--replay`` options.
+"""
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+import requests
+import http_client
+
+log = logging.getLogger(__name__)
+
+DEFAULT_FIXTURE_DIR = Path("fixtures/http")
+# Response headers stored in a fixture: the ones the scripts read, plus the
+# upstream's rate limit headers for reference
+FIXTURE_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link', 'X-Total-Pages', 'X-Next-Page',
+                   'X-Rate-Limit-Limit', 'X-Rate-Limit-Interval')
+# Request headers that select a different representation of the same URL
+VARYING_HEADERS = ('Accept',)
+# Request headers forwarded upstream when recording; conditional headers are
+# dropped so every fixture holds a full response
+FORWARDED_HEADERS = ('Accept', 'Authorization', 'PRIVATE-TOKEN', 'User-Agent', 'Content-Type')
+
+def fixture_key(method: str, target: str, accept: str = '', body: bytes = b'') -> str:
+    """Hash a request into its fixture name; query parameters are compared in sorted order."""
+    parts = urlsplit(target)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    digest = hashlib.sha256(f"{method.upper()}\n{parts.path}?{query}\n{accept}\n".encode('utf-8'))
+    digest.update(body)
+    return digest.hexdigest()
+
+class FixtureStore:
+    """Directory of recorded exchanges, one JSON file per request under a folder per host."""
+
+    def __init__(self, directory: Path = DEFAULT_FIXTURE_DIR):
+        self.directory = Path(directory)
+
+    def _path(self, key: str, target: str) -> Path:
+        host = target.lstrip('/').split('/', 1)[0] or '_'
+        return self.directory / host / f"{key[:24]}.json"
+
+    def load(self, key: str, target: str) -> Optional[Dict]:
+        try:
+            return json.loads(self._path(key, target).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def add(self, method: str, url: str, body: str, status: int = 200, headers: Optional[Dict[str, str]] = None,
+            accept: str = '', request_body: bytes = b'') -> None:
+        """Store a hand-made exchange, e.g. a synthetic answer for a benchmark."""
+        target = '/' + url.split('://', 1)[1]
+        self.save(fixture_key(method, target, accept, request_body), target, {
+            'method': method,
+            'url': url,
+            'status': status,
+            'headers': headers or {},
+            'body': body,
+            'elapsed': 0.0,
+        })
+
+    def save(self, key: str, target: str, fixture: Dict) -> None:
+        path = self._path(key, target)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{id(fixture)}.tmp")
+        tmp.write_text(json.dumps(fixture, indent=1, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, path)
+
+class HostQuota:
+    """Fixed-window request quota per host, as GitHub and GitLab enforce them."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._lock = Lock()
+        self._windows: Dict[str, Tuple[float, int]] = {}
+
+    def take(self, host: str) -> Tuple[bool, Dict[str, str]]:
+        """Count one request to ``host``.
+
+        Returns:
+            Tuple of (allowed, rate limit headers to send with the answer)
+        """
+        now = time.time()
+        with self._lock:
+            start, used = self._windows.get(host, (now, 0))
+            if now >= start + self.window:
+                start, used = now, 0
+            allowed = used < self.limit
+            if allowed:
+                used += 1
+            self._windows[host] = (start, used)
+        reset = start + self.window
+        remaining = str(self.limit - used)
+        headers = {
+            'X-RateLimit-Limit': str(self.limit), 'X-RateLimit-Remaining': remaining,
+            'X-RateLimit-Reset': str(int(reset) + 1),
+            'RateLimit-Limit': str(self.limit), 'RateLimit-Remaining': remaining,
+            'RateLimit-Reset': str(int(reset) + 1),
+        }
+        if not allowed:
+            headers['Retry-After'] = str(max(1, int(reset - now) + 1))
+        return allowed, headers
+
+class ReplayServer(ThreadingHTTPServer):
+    """Local stand-in for the APIs, recording or replaying fixtures.
+
+    Args:
+        fixtures: Fixture store
+        record: Forward requests upstream and store the answers instead of replaying
+        latency: Seconds added to every replayed answer; None replays the recorded latency
+        jitter: Fraction of ``latency`` randomly added or removed
+        quota: Per-host request quota enforced on replayed answers, if any
+        port: Port to listen on; 0 picks a free one
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fixtures: FixtureStore, record: bool = False, latency: Optional[float] = 0.0,
+                 jitter: float = 0.0, quota: Optional[HostQuota] = None, port: int = 0):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.fixtures = fixtures
+        self.record = record
+        self.latency = latency
+        self.jitter = jitter
+        self.quota = quota
+        self.upstream = requests.Session()
+        self._lock = Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.missing = 0
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self, fixture: Dict) -> float:
+        latency = fixture.get('elapsed', 0.0) if self.latency is None else self.latency
+        return max(0.0, latency * (1 + random.uniform(-self.jitter, self.jitter)))
+
+class _Handler(BaseHTTPRequestHandler):
+    server: ReplayServer
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def log_message(self, format, *args):
+        log.debug("replay: " + format, *args)
+
+    def _handle(self) -> None:
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        host = self.path.lstrip('/').split('/', 1)[0]
+        accept = ''.join(self.headers.get(name, '') for name in VARYING_HEADERS)
+        key = fixture_key(self.command, self.path, accept, body)
+        server = self.server
+
+        if server.record:
+            try:
+                fixture = self._forward(body)
+            except requests.RequestException as e:
+                log.warning("Could not record %s %s: %s", self.command, self.path, e)
+                self._answer(502, {'Content-Type': 'application/json'}, json.dumps({'message': str(e)}))
+                return
+            server.fixtures.save(key, self.path, fixture)
+            server.count('recorded')
+            self._answer(fixture['status'], fixture['headers'], fixture['body'])
+            return
+
+        fixture = server.fixtures.load(key, self.path)
+        if fixture is None:
+            server.count('missing')
+            log.warning("No fixture for %s %s", self.command, self.path)
+            self._answer(404, {'Content-Type': 'application/json'}, json.dumps({'message': 'No fixture'}))
+            return
+        headers = dict(fixture['headers'])
+        if server.quota:
+            allowed, quota_headers = server.quota.take(host)
+            headers.update(quota_headers)
+            if not allowed:
+                self._answer(429, quota_headers, json.dumps({'message': 'Rate limit exceeded'}))
+                return
+        time.sleep(server.delay(fixture))
+        server.count('replayed')
+        etag = headers.get('ETag')
+        if etag and self.headers.get('If-None-Match') == etag:
+            self._answer(304, headers, '')
+        else:
+            self._answer(fixture['status'], headers, fixture['body'])
+
+    def _forward(self, body: bytes) -> Dict:
+        """Send the request to the real host and turn the answer into a fixture."""
+        url = f"https:/{self.path}"
+        headers = {name: self.headers[name] for name in FORWARDED_HEADERS if name in self.headers}
+        start = time.perf_counter()
+        response = self.server.upstream.request(self.command, url, headers=headers, data=body or None,
+                                                timeout=http_client.DEFAULT_TIMEOUT)
+        return {
+            'method': self.command,
+            'url': url,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in FIXTURE_HEADERS if name in response.headers},
+            'body': response.text,
+            'elapsed': round(time.perf_counter() - start, 4),
+        }
+
+    def _answer(self, status: int, headers: Dict[str, str], body: str) -> None:
+        data = body.encode('utf-8')
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+def parse_rate(value: str) -> HostQuota:
+    """Parse a ``N/SECONDS`` quota such as ``60/3600``."""
+    limit, sep, window = value.partition('/')
+    try:
+        return HostQuota(int(limit), float(window) if sep else 60.0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid rate (expected N/SECONDS): {value}")
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the record / replay options shared by the scripts."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--record",
+        type=Path,
+        metavar="DIR",
+        help="Record every API exchange as a fixture in DIR"
+    )
+    group.add_argument(
+        "--replay",
+        type=Path,
+        metavar="DIR",
+        help="Answer every API request from the fixtures in DIR, without network"
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="With --replay, delay every answer by SECONDS instead of the recorded latency"
+    )
+    parser.add_argument(
+        "--replay-rate",
+        type=parse_rate,
+        default=None,
+        metavar="N/SECONDS",
+        help="With --replay, allow N requests per host every SECONDS and answer 429 beyond that"
+    )
+
+@contextmanager
+def serve(fixtures: Path, record: bool = False, latency: Optional[float] = None, jitter: float = 0.0,
+          quota: Optional[HostQuota] = None, port: int = 0) -> Iterator[ReplayServer]:
+    """Run a ``ReplayServer`` in a background thread and send ``http_client`` traffic to it."""
+    server = ReplayServer(FixtureStore(fixtures), record, latency, jitter, quota, port)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    http_client.configure_replay(server.base_url)
+    log.info("%s API traffic through %s (fixtures in %s)", "Recording" if record else "Replaying",
+             server.base_url, fixtures)
+    try:
+        yield server
+    finally:
+        http_client.configure_replay(None)
+        server.shutdown()
+        server.server_close()
+        if record:
+            log.info("Recorded %d API exchanges", server.recorded)
+        else:
+            log.info("Replayed %d API exchanges, %d without fixture", server.replayed, server.missing)
+
+@contextmanager
+def from_args(args: argparse.Namespace) -> Iterator[Optional[ReplayServer]]:
+    """Start the server chosen by ``--record`` / ``--replay``, if any."""
+    if args.record or args.replay:
+        with serve(args.record or args.replay, record=bool(args.record),
+                   latency=args.replay_latency, quota=args.replay_rate) as server:
+            yield server
+    else:
+        yield None
+
+def run(function: Callable[[argparse.Namespace], None], args: argparse.Namespace) -> None:
+    """Call a script's ``update(args)`` with the server chosen by ``--record`` / ``--replay`` running."""
+    with from_args(args):
+        function(args)
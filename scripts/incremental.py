@@ -0,0 +1,72 @@
+"""Helpers for incremental rebuilds of the generated pages.
+
+Content hashes decide whether an input changed since the last run, a JSON
+manifest remembers those hashes (and whatever results are worth reusing)
+between runs, and ``write_if_changed`` leaves output files untouched when
+their content is the same, so mkdocs does not see a new mtime.
+"""
+from typing import Any, Dict, Union
+from pathlib import Path
+import hashlib
+import json
+import os
+
+def content_hash(data: Any) -> str:
+    """Hash JSON-serializable data independently of dict key order."""
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def text_hash(text: str) -> str:
+    """Hash a string."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def file_hash(path: Union[str, Path]) -> str:
+    """Hash a file's bytes, or return an empty string if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return ''
+    return digest.hexdigest()
+
+def write_if_changed(path: Union[str, Path], content: str) -> bool:
+    """Write ``content`` to ``path`` unless the file already holds exactly that.
+
+    Returns:
+        True if the file was written
+    """
+    path = Path(path)
+    if path.exists() and file_hash(path) == text_hash(content):
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(content, encoding='utf-8')
+    os.replace(tmp, path)
+    return True
+
+class Manifest:
+    """JSON manifest of the previous run's hashes and reusable results."""
+
+    def __init__(self, path: Union[str, Path], version: int = 1):
+        self.path = Path(path)
+        self.version = version
+        self.data: Dict[str, Any] = {}
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            data = {}
+        if data.get('version') == version:
+            self.data = data
+        self.data['version'] = version
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.data[key] = value
+
+    def save(self) -> None:
+        """Write the manifest back to disk."""
+        write_if_changed(self.path, json.dumps(self.data, ensure_ascii=False))
@@ -0,0 +1,197 @@
+"""Timing, request statistics and logging setup for the update scripts.
+
+Code wraps its stages in ``stage(name)`` and the HTTP layer reports every
+request with ``record_request``; the collected figures are summarized in the
+log at the end of a run and, with ``--profile``, written to a JSON report
+(optionally together with a cProfile dump of the whole run).
+"""
+from typing import Callable, Dict, List, Optional
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+import argparse
+import bisect
+import cProfile
+import io
+import json
+import logging
+import pstats
+import time
+
+# Upper bounds in seconds of the request latency histogram buckets; a last,
+# open bucket counts slower requests
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Functions listed in the report when running under cProfile
+PROFILE_TOP = 30
+
+class Stats:
+    """Thread-safe collector of stage timings, per-host request figures and cache counters."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.hosts: Dict[str, Dict] = {}
+        self.caches: Dict[str, Dict[str, int]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Context manager adding the wall time of its block to stage ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start)
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+
+    def record_request(self, host: str, seconds: float, status: Optional[int] = None) -> None:
+        """Count one request to ``host``; a status of None marks a request that failed without answer."""
+        with self._lock:
+            entry = self.hosts.setdefault(host, {
+                'requests': 0,
+                'seconds': 0.0,
+                'max_seconds': 0.0,
+                'status': {},
+                'histogram': [0] * (len(LATENCY_BUCKETS) + 1),
+            })
+            entry['requests'] += 1
+            entry['seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            key = str(status) if status is not None else 'error'
+            entry['status'][key] = entry['status'].get(key, 0) + 1
+            entry['histogram'][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def record_cache(self, name: str, hits: int, misses: int) -> None:
+        """Set the hit and miss counts of cache ``name``."""
+        with self._lock:
+            self.caches[name] = {'hits': hits, 'misses': misses}
+
+    def report(self) -> Dict:
+        """Get the collected figures as JSON-serializable data."""
+        with self._lock:
+            hosts = {}
+            for host, entry in self.hosts.items():
+                hosts[host] = dict(
+                    entry,
+                    mean_seconds=entry['seconds'] / entry['requests'],
+                    histogram={bound: count for bound, count in zip(
+                        [f"<={b}s" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"], entry['histogram']
+                    )},
+                )
+            caches = {
+                name: dict(counts, hit_rate=counts['hits'] / max(1, counts['hits'] + counts['misses']))
+                for name, counts in self.caches.items()
+            }
+            return {'stages': dict(self.stages), 'hosts': hosts, 'caches': caches}
+
+    def summary(self) -> List[str]:
+        """Summarize the figures as log lines."""
+        report = self.report()
+        lines = []
+        if report['stages']:
+            lines.append("Stages: " + ", ".join(
+                f"{name} {entry['seconds']:.2f}s" for name, entry in report['stages'].items()
+            ))
+        for host, entry in report['hosts'].items():
+            lines.append(f"{host}: {entry['requests']} requests, mean {entry['mean_seconds'] * 1000:.0f}ms, "
+                         f"max {entry['max_seconds'] * 1000:.0f}ms")
+        for name, entry in report['caches'].items():
+            lines.append(f"{name} cache: {entry['hits']} hits, {entry['misses']} misses "
+                         f"({entry['hit_rate']:.0%} hit rate)")
+        return lines
+
+# Collector shared by the modules of one run
+stats = Stats()
+
+def stage(name: str):
+    """Time a block as stage ``name`` of the shared collector."""
+    return stats.stage(name)
+
+def record_request(host: str, seconds: float, status: Optional[int] = None) -> None:
+    """Count one request in the shared collector."""
+    stats.record_request(host, seconds, status)
+
+def record_cache(name: str, hits: int, misses: int) -> None:
+    """Set a cache's counters in the shared collector."""
+    stats.record_cache(name, hits, misses)
+
+class _Formatter(logging.Formatter):
+    """Plain messages, with the level prepended to warnings and errors."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        if record.levelno >= logging.WARNING:
+            return f"{record.levelname.lower()}: {message}"
+        return message
+
+def add_arguments(parser: argparse.ArgumentParser, script: str) -> None:
+    """Add the logging and profiling options shared by the scripts."""
+    parser.add_argument(
+        "-v", "--verbose",
+        action="count",
+        default=0,
+        help="Log every record processed (debug level)"
+    )
+    parser.add_argument(
+        "-q", "--quiet",
+        action="store_true",
+        help="Only log warnings and errors"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        nargs="?",
+        const=Path(f".cache/profile/{script}.json"),
+        default=None,
+        help="Write a JSON report of stage timings, requests and cache hit rates to this path"
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="With --profile, also run under cProfile and save the profile next to the report"
+    )
+
+def configure_logging(verbose: int = 0, quiet: bool = False) -> None:
+    """Send log records to stderr at the level chosen on the command line."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(_Formatter("%(message)s"))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(logging.WARNING if quiet else logging.DEBUG if verbose else logging.INFO)
+
+def run(function: Callable[[], None], args: argparse.Namespace) -> None:
+    """Run a script's work, then log the figures and write the ``--profile`` report.
+
+    Args:
+        function: The script's work
+        args: Parsed arguments including the options of ``add_arguments``
+    """
+    configure_logging(args.verbose, args.quiet)
+    log = logging.getLogger(__name__)
+    profiler = cProfile.Profile() if args.profile and args.cprofile else None
+    start = time.perf_counter()
+    try:
+        if profiler:
+            profiler.runcall(function)
+        else:
+            function()
+    finally:
+        elapsed = time.perf_counter() - start
+        for line in stats.summary():
+            log.info(line)
+        log.info("Finished in %.2fs", elapsed)
+        if args.profile:
+            report = dict(stats.report(), wall_seconds=elapsed)
+            args.profile.parent.mkdir(parents=True, exist_ok=True)
+            if profiler:
+                profile_path = args.profile.with_suffix('.prof')
+                profiler.dump_stats(profile_path)
+                text = io.StringIO()
+                pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(PROFILE_TOP)
+                report['cprofile'] = {'path': str(profile_path), 'top': text.getvalue().splitlines()}
+            args.profile.write_text(json.dumps(report, indent=2))
+            log.info("Profile report written to %s", args.profile)
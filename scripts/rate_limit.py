@@ -0,0 +1,240 @@
+"""Client-side rate limiting for the update scripts.
+
+A ``RateLimiter`` is a token bucket for one API: requests start at a
+sustained rate of ``limit`` per ``interval`` seconds, up to ``burst`` of
+them back to back, with at most ``max_concurrency`` in flight. Callers can
+push back the next request after the server signals throttling (HTTP 429).
+
+A ``RequestScheduler`` keeps one limiter per host and reads the quota
+headers of every response (GitHub's ``X-RateLimit-*``, GitLab's
+``RateLimit-*``): a quota with room to spare raises the host's rate, once
+the quota is used up requests wait for its reset instead of failing, and
+throttled or failed (429 / 5xx) requests are retried with jittered
+exponential backoff.
+"""
+from typing import Callable, Dict, Mapping, Optional, Tuple
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from threading import BoundedSemaphore, Lock
+import logging
+import random
+import re
+import time
+import requests
+
+log = logging.getLogger(__name__)
+
+# Backoff after a throttled or failed request: base * 2**attempt, capped, with full jitter
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# Sustained (requests, seconds) rate per host for the scheduler, below the
+# APIs' documented limits; other hosts get DEFAULT_HOST_RATE. Quota headers
+# announcing more room raise a host's rate.
+HOST_RATES: Dict[str, Tuple[int, float]] = {
+    'api.github.com': (15, 1.0),  # GitHub's secondary limit is 900 points a minute
+    'gitlab.com': (30, 1.0),
+}
+DEFAULT_HOST_RATE = (10, 1.0)
+# Requests a host's bucket lets through back to back; enough for a typical
+# page walk or the lookups of a URL list
+DEFAULT_BURST = 50
+# Retries of a throttled or failed request
+DEFAULT_RETRIES = 4
+# Server errors worth retrying
+RETRY_STATUSES = {500, 502, 503, 504}
+# Longest wait for a quota reset before giving up instead
+MAX_QUOTA_WAIT = 15 * 60
+
+class RateLimitExceeded(Exception):
+    """Raised when an API is still throttling after the retries, or its quota resets too late."""
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Jittered exponential backoff delay in seconds for a retry attempt (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def parse_interval(value: str) -> Optional[float]:
+    """Parse an interval such as ``1s``, ``500ms`` or ``2m`` into seconds."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*(ms|s|m)?\s*', value or '')
+    if not match:
+        return None
+    number, unit = float(match.group(1)), match.group(2) or 's'
+    return number / 1000 if unit == 'ms' else number * 60 if unit == 'm' else number
+
+class RateLimiter:
+    """Paces requests to one API: ``limit`` starts per ``interval`` seconds, ``max_concurrency`` in flight."""
+
+    def __init__(self, limit: int, interval: float = 1.0, max_concurrency: int = 1, burst: int = 1):
+        self.limit = max(1, limit)
+        self.interval = interval
+        self.max_concurrency = max(1, max_concurrency)
+        self.burst = max(1, burst)
+        self._semaphore = BoundedSemaphore(self.max_concurrency)
+        self._lock = Lock()
+        self._next_start = 0.0
+
+    def update(self, limit: Optional[int] = None, interval: Optional[float] = None) -> None:
+        """Adopt limits announced by the server."""
+        with self._lock:
+            if limit:
+                self.limit = max(1, limit)
+            if interval:
+                self.interval = interval
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for at least ``seconds`` from now."""
+        with self._lock:
+            self._next_start = max(self._next_start, time.monotonic() + seconds)
+
+    def delay(self) -> float:
+        """Seconds until the next request may start."""
+        with self._lock:
+            return max(0.0, self._next_start - time.monotonic())
+
+    def _wait_turn(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            spacing = self.interval / self.limit
+            # A request may start early while the bucket still holds tokens,
+            # i.e. while the schedule is less than ``burst`` slots ahead of now
+            start = max(now - (self.burst - 1) * spacing, self._next_start)
+            self._next_start = start + spacing
+        if start > now:
+            time.sleep(start - now)
+
+    @contextmanager
+    def slot(self):
+        """Context manager wrapping one request: waits for a concurrency slot and for its turn."""
+        with self._semaphore:
+            self._wait_turn()
+            yield
+
+def crossref_limiter(mailto: Optional[str] = None) -> RateLimiter:
+    """Create a limiter with Crossref's documented defaults for the polite or public pool."""
+    if mailto:
+        return RateLimiter(limit=10, interval=1.0, max_concurrency=3)
+    return RateLimiter(limit=5, interval=1.0, max_concurrency=1)
+
+def update_from_crossref_headers(limiter: RateLimiter, headers: Mapping[str, str]) -> None:
+    """Apply Crossref's ``X-Rate-Limit-Limit`` / ``X-Rate-Limit-Interval`` headers to a limiter."""
+    limit = headers.get('X-Rate-Limit-Limit') or headers.get('x-rate-limit-limit')
+    interval = headers.get('X-Rate-Limit-Interval') or headers.get('x-rate-limit-interval')
+    limiter.update(
+        int(limit) if limit and str(limit).isdigit() else None,
+        parse_interval(interval) if interval else None
+    )
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header (seconds or an HTTP date) into seconds from now."""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def quota_from_headers(headers: Mapping[str, str]) -> Tuple[Optional[int], Optional[float]]:
+    """Read the remaining quota and its reset time from GitHub or GitLab rate limit headers.
+
+    Returns:
+        Tuple of (remaining requests, seconds until the quota resets); either is
+        None when the response does not say
+    """
+    for prefix in ('X-RateLimit-', 'RateLimit-'):
+        remaining = headers.get(f'{prefix}Remaining')
+        if remaining is not None and str(remaining).isdigit():
+            reset = headers.get(f'{prefix}Reset')
+            # Both APIs send the reset as a Unix timestamp
+            seconds = max(0.0, float(reset) - time.time()) if reset and str(reset).isdigit() else None
+            return int(remaining), seconds
+    return None, None
+
+class RequestScheduler:
+    """Per-host token buckets driven by the quota headers of the responses.
+
+    Args:
+        rates: Sustained (requests, seconds) rate per host, overriding ``HOST_RATES``
+        burst: Requests each host's bucket lets through back to back
+        max_concurrency: Requests in flight per host
+        retries: Retries of a throttled (429, or GitHub's rate limit 403) or failed (5xx) request
+        max_wait: Longest wait for a quota reset; a later reset raises ``RateLimitExceeded``
+    """
+
+    def __init__(self, rates: Optional[Dict[str, Tuple[int, float]]] = None, burst: int = DEFAULT_BURST,
+                 max_concurrency: int = 16, retries: int = DEFAULT_RETRIES, max_wait: float = MAX_QUOTA_WAIT):
+        self.rates = {**HOST_RATES, **(rates or {})}
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.max_wait = max_wait
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = Lock()
+
+    def limiter(self, host: str) -> RateLimiter:
+        """Get the limiter of a host, creating it on first use."""
+        with self._lock:
+            if host not in self._limiters:
+                limit, interval = self.rates.get(host, DEFAULT_HOST_RATE)
+                self._limiters[host] = RateLimiter(limit, interval, self.max_concurrency, self.burst)
+            return self._limiters[host]
+
+    def observe(self, host: str, response: requests.Response) -> Optional[float]:
+        """Apply a response's quota headers to its host's limiter.
+
+        Returns:
+            None if the response can be used, otherwise the seconds to wait
+            before retrying (0 when the server did not say)
+        """
+        limiter = self.limiter(host)
+        remaining, reset = quota_from_headers(response.headers)
+        if remaining and reset and reset >= 1 and remaining / reset > limiter.limit / limiter.interval:
+            # The quota left until the reset allows a faster pace, e.g. on a self-hosted GitLab
+            limiter.update(remaining, reset)
+        if remaining == 0 and reset is not None:
+            # Hold the next requests until the quota resets rather than spend them on errors
+            limiter.pause(reset + 1)
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        status = response.status_code
+        # GitHub answers 403 both for its primary limit (no quota left) and its secondary one (Retry-After)
+        throttled = status == 429 or (status == 403 and (remaining == 0 or retry_after is not None))
+        if throttled:
+            wait = retry_after if retry_after is not None else (reset + 1 if remaining == 0 and reset is not None else 0.0)
+            limiter.pause(wait)
+            return wait
+        if status in RETRY_STATUSES:
+            return 0.0
+        return None
+
+    def send(self, host: str, send: Callable[[], requests.Response]) -> requests.Response:
+        """Send a request to ``host`` when its bucket allows, retrying throttled and failed attempts.
+
+        Args:
+            host: Host the request goes to
+            send: Function sending the request once
+
+        Returns:
+            The first usable response, or the last 5xx response once the retries are spent
+        """
+        limiter = self.limiter(host)
+        for attempt in range(self.retries + 1):
+            delay = limiter.delay()
+            if delay > self.max_wait:
+                raise RateLimitExceeded(f"{host} rate limit resets in {delay:.0f}s, not waiting that long")
+            with limiter.slot():
+                response = send()
+            wait = self.observe(host, response)
+            if wait is None:
+                return response
+            if wait > self.max_wait:
+                raise RateLimitExceeded(f"{host} rate limit resets in {wait:.0f}s, not waiting that long")
+            if attempt < self.retries:
+                # Without a server hint, back off exponentially with jitter
+                wait = wait or backoff_delay(attempt)
+                log.warning("%s answered %d, retrying in %.1fs", host, response.status_code, wait)
+                limiter.pause(wait)
+        if response.status_code in RETRY_STATUSES:
+            return response
+        raise RateLimitExceeded(f"{host} is still rate limiting after {self.retries} retries "
+                                f"(HTTP {response.status_code}, resets in {limiter.delay():.0f}s)")
@@ -0,0 +1,69 @@
+"""Content-addressed store of generated file snapshots.
+
+Each snapshot is named after the hash of its content, so writing the same
+content twice does not create a second file, and an ``index.json`` lists the
+snapshots from oldest to newest. Only the ``keep`` most recent snapshots are
+retained; older ones are deleted when a new one is added.
+"""
+from typing import Dict, List, Optional, Union
+from datetime import datetime
+from pathlib import Path
+import json
+from incremental import text_hash, write_if_changed
+
+DEFAULT_SNAPSHOT_DIR = Path("snapshots")
+DEFAULT_KEEP = 5
+
+class SnapshotStore:
+    """Directory of content-addressed snapshots with a retention limit."""
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_SNAPSHOT_DIR, keep: int = DEFAULT_KEEP):
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+        self.index_path = self.directory / "index.json"
+
+    def entries(self) -> List[Dict]:
+        """List the snapshots, oldest first, as ``{'hash', 'file', 'created'}`` dicts."""
+        try:
+            return json.loads(self.index_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return []
+
+    def latest(self) -> Optional[Path]:
+        """Get the path of the newest snapshot, if any."""
+        entries = self.entries()
+        return self.directory / entries[-1]['file'] if entries else None
+
+    def add(self, content: str, stem: str, suffix: str, created: Optional[str] = None) -> Path:
+        """Store ``content`` unless an identical snapshot exists, then apply the retention limit.
+
+        Args:
+            content: Snapshot content
+            stem: File name prefix, e.g. ``my_pubs_supplemented``
+            suffix: File extension, e.g. ``.bibtex``
+            created: Creation time to record; defaults to now
+
+        Returns:
+            Path of the snapshot holding ``content``
+        """
+        digest = text_hash(content)
+        entries = self.entries()
+        existing = next((entry for entry in entries if entry['hash'] == digest), None)
+        if existing:
+            # Same content as an older snapshot: make it the newest again instead of copying it
+            entries.remove(existing)
+            entry = existing
+        else:
+            entry = {
+                'hash': digest,
+                'file': f"{stem}_{digest[:12]}{suffix}",
+                'created': created or datetime.now().isoformat(timespec='seconds'),
+            }
+            write_if_changed(self.directory / entry['file'], content)
+        entries.append(entry)
+
+        for old in entries[:-self.keep]:
+            (self.directory / old['file']).unlink(missing_ok=True)
+        entries = entries[-self.keep:]
+        write_if_changed(self.index_path, json.dumps(entries, indent=2) + "\n")
+        return self.directory / entry['file']
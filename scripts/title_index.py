@@ -0,0 +1,286 @@
+"""Near-duplicate detection for publication titles.
+
+Titles are first canonicalized (Unicode folding, LaTeX commands and braces
+dropped, punctuation removed), which already catches most variants. Titles
+that still differ are compared as sets of character 4-grams.
+
+``match_titles`` matches titles against a set of known titles, and
+``cluster_titles`` groups near-duplicate titles with each other. Candidates
+are blocked on a length bucket and the first and last rare words in one
+vectorized pass, and only the few pairs sharing a block are scored, so the
+work grows with the number of titles rather than with the number of pairs.
+
+``TitleDoiIndex`` uses the same canonical titles and n-grams to look up the
+DOI of a known work by title; its inverted index over each title's rarest
+4-grams (prefix filtering) finds every candidate that can reach the
+threshold.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from collections import Counter, defaultdict
+from itertools import chain
+from threading import Lock
+import math
+import re
+import unicodedata
+import polars as pl
+
+# Minimum 4-gram Jaccard similarity for two canonical titles to be merged
+DEFAULT_THRESHOLD = 0.85
+# Length of the character n-grams titles are compared by
+SHINGLE_SIZE = 4
+# Minimum similarity for a title lookup to accept a fuzzy match; stricter than
+# matching during the merge, since a wrong DOI pulls in another work's metadata
+LOOKUP_THRESHOLD = 0.9
+# A word is rare enough to block titles on when it occurs at most
+# max(RARE_WORD_COUNT, RARE_WORD_SHARE * number of known titles) times
+RARE_WORD_SHARE = 0.001
+RARE_WORD_COUNT = 5
+
+_LATEX_COMMAND = re.compile(r'\\(?:[a-zA-Z]+|.)\s*')
+_NON_WORD = re.compile(r'[\W_]+')
+# Tokens that tell otherwise near-identical titles apart ("Part I" / "Part II", years)
+_DISTINGUISHING = re.compile(r'^(?:\d+|[ivxl]{1,4})$')
+
+def canonical_title(title: str) -> str:
+    """Canonicalize a title: fold accents, drop LaTeX markup and punctuation, lowercase."""
+    if not title:
+        return ''
+    text = _LATEX_COMMAND.sub('', title)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = _NON_WORD.sub(' ', text.lower()).strip()
+    # Titles made only of markup and punctuation keep their plain lowercase form
+    return text or ' '.join(title.lower().split())
+
+def title_shingles(canonical: str) -> Set[str]:
+    """Character n-grams of a canonical title, padded so the first and last words give some."""
+    padded = f" {canonical} "
+    return {padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+def _distinguishing_tokens(canonical: str) -> Set[str]:
+    return {token for token in canonical.split() if _DISTINGUISHING.match(token)}
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
+
+def _title_words(titles: pl.Series, threshold: float) -> pl.DataFrame:
+    """One row per word of each canonical title, with the title's length bucket and the word's position.
+
+    Titles whose lengths are in the same or adjacent buckets are the only ones
+    that can reach ``threshold``.
+    """
+    return (
+        pl.DataFrame({'title': titles})
+        .with_columns(
+            (pl.col('title').str.len_chars().log() / -math.log(threshold)).floor().cast(pl.Int32).alias('bucket'),
+            pl.col('title').str.split(' ').alias('word'),
+        )
+        .explode('word')
+        .with_row_index('position')
+    )
+
+def _block_words(words: pl.DataFrame, limit: float) -> pl.DataFrame:
+    """Pick each title's block words: its first and last words occurring at most ``limit`` times.
+
+    Titles without such a word are blocked on their rarest word. With two
+    block words, a typo in one of them does not keep two variants apart.
+    """
+    rare = pl.col('count') <= limit
+    position = pl.col('position').cast(pl.Int64)
+    return (
+        words.group_by('title', 'bucket').agg(
+            pl.col('word').sort_by(~rare, pl.when(rare).then(position).otherwise(pl.col('count'))).first()
+            .alias('first'),
+            pl.col('word').sort_by(~rare, pl.when(rare).then(-position).otherwise(pl.col('count'))).first()
+            .alias('last'),
+        )
+        .unpivot(['first', 'last'], index=['title', 'bucket'], value_name='word')
+        .select('title', 'bucket', 'word')
+        .unique()
+    )
+
+def _candidate_pairs(titles: pl.Series, known: pl.Series, threshold: float) -> pl.DataFrame:
+    """Pairs of a title and a known title sharing a block word, in the same or adjacent length buckets.
+
+    Words are rare when they occur in at most ``RARE_WORD_SHARE`` of the known titles.
+    """
+    known_words = _title_words(known, threshold)
+    counts = known_words.group_by('word').agg(pl.len().alias('count'))
+    limit = max(RARE_WORD_COUNT, len(known) * RARE_WORD_SHARE)
+    # Words no known title has cannot be a known title's block word, so the inner join drops them
+    blocks = _block_words(_title_words(titles, threshold).join(counts, on='word'), limit)
+    # Only known titles containing one of the block words can be in the same block
+    candidates = known_words.filter(pl.col('word').is_in(blocks['word'].implode()))['title'].unique()
+    known_blocks = _block_words(
+        known_words.filter(pl.col('title').is_in(candidates.implode())).join(counts, on='word'), limit
+    )
+    return (
+        blocks.join(known_blocks, on='word', suffix='_known')
+        .filter((pl.col('bucket') - pl.col('bucket_known')).abs() <= 1)
+        .filter(pl.col('title') != pl.col('title_known'))
+        .select('title', 'title_known')
+        .unique()
+        .sort('title', 'title_known')
+    )
+
+def _similar_pairs(pairs: pl.DataFrame, threshold: float) -> Iterator[Tuple[str, str, float]]:
+    """Score candidate pairs, yielding those at or above ``threshold`` with the same distinguishing tokens."""
+    shingles: Dict[str, Set[str]] = {}
+    for title, candidate in pairs.iter_rows():
+        for key in (title, candidate):
+            if key not in shingles:
+                shingles[key] = title_shingles(key)
+        score = _jaccard(shingles[title], shingles[candidate])
+        if score >= threshold and _distinguishing_tokens(title) == _distinguishing_tokens(candidate):
+            yield title, candidate, score
+
+def match_titles(titles: pl.Series, known: pl.Series, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, str]:
+    """Match canonical titles to their most similar known canonical title.
+
+    Titles are blocked on their length bucket and on their first and last
+    rare words (found in at most ``RARE_WORD_SHARE`` of the known titles, or
+    their rarest word), and only compared with the known titles sharing a
+    block in adjacent length buckets. Blocking can miss a variant whose first
+    and last rare words both differ; in exchange the cost stays linear in the
+    number of titles.
+
+    Args:
+        titles: Canonical titles to match, e.g. those of entries without a DOI
+        known: Canonical titles to match against
+        threshold: Minimum 4-gram Jaccard similarity of a match
+
+    Returns:
+        Map from each matched title to its known title; exact matches and
+        titles without a match are left out
+    """
+    known = known.filter(known != '').unique()
+    titles = titles.filter((titles != '') & ~titles.is_in(known.implode())).unique()
+    if titles.is_empty() or known.is_empty():
+        return {}
+    matches: Dict[str, str] = {}
+    scores: Dict[str, float] = {}
+    for title, candidate, score in _similar_pairs(_candidate_pairs(titles, known, threshold), threshold):
+        if score > scores.get(title, 0.0):
+            matches[title], scores[title] = candidate, score
+    return matches
+
+def cluster_titles(titles: pl.Series, known: pl.Series, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, str]:
+    """Group near-duplicate canonical titles and give each group one key.
+
+    Titles are matched with each other, with the same blocking as
+    ``match_titles``, and the matching pairs are joined into clusters. A
+    title equal or matched to a known title takes that title as key; the
+    other titles of its cluster take the known title most of the cluster was
+    matched to, or else the cluster's smallest title. Each cluster then needs
+    a single lookup.
+
+    Args:
+        titles: Canonical titles to cluster, e.g. those of entries without a DOI
+        known: Canonical titles a cluster can be attached to
+        threshold: Minimum 4-gram Jaccard similarity of two near-duplicates
+
+    Returns:
+        Map from each title to its cluster's key; titles that are their own key are left out
+    """
+    titles = titles.filter(titles != '').unique()
+    if titles.is_empty():
+        return {}
+    known = known.filter(known != '').unique()
+    attached = match_titles(titles, known, threshold)
+    attached.update((title, title) for title in titles.filter(titles.is_in(known.implode())).to_list())
+
+    parent = {title: title for title in titles.to_list()}
+    def find(title: str) -> str:
+        while parent[title] != title:
+            parent[title] = parent[parent[title]]
+            title = parent[title]
+        return title
+    for title, other, _ in _similar_pairs(_candidate_pairs(titles, titles, threshold), threshold):
+        parent[find(title)] = find(other)
+
+    clusters: Dict[str, List[str]] = defaultdict(list)
+    for title in parent:
+        clusters[find(title)].append(title)
+    keys: Dict[str, str] = {}
+    for members in clusters.values():
+        targets = Counter(attached[title] for title in members if title in attached)
+        key = min(targets, key=lambda target: (-targets[target], target)) if targets else min(members)
+        for title in members:
+            keys[title] = attached.get(title, key)
+    return {title: key for title, key in keys.items() if key != title}
+
+class TitleDoiIndex:
+    """In-memory map from titles to DOIs with fuzzy lookup, safe to share between threads.
+
+    Titles are stored canonicalized. A lookup first tries the exact canonical
+    title, then the indexed titles sharing one of the query's rarest n-grams,
+    accepting the most similar one at or above ``threshold``.
+    """
+
+    def __init__(self, threshold: float = LOOKUP_THRESHOLD):
+        self.threshold = threshold
+        self._lock = Lock()
+        self._dois: Dict[str, str] = {}
+        self._titles: List[str] = []
+        self._shingles: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        # Pairs added since creation that are not persisted yet
+        self.added: List[Tuple[str, str]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def load(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Add already persisted (canonical title, DOI) pairs."""
+        for title, doi in pairs:
+            self._insert(title, doi)
+
+    def add(self, title: str, doi: str) -> None:
+        """Record the DOI of a title, unless the title is empty or already known."""
+        key = canonical_title(title)
+        if key and doi:
+            with self._lock:
+                if self._insert(key, doi):
+                    self.added.append((key, doi))
+
+    def _insert(self, key: str, doi: str) -> bool:
+        if key in self._dois:
+            return False
+        self._dois[key] = doi
+        grams = title_shingles(key)
+        for gram in grams:
+            self._postings[gram].append(len(self._titles))
+        self._titles.append(key)
+        self._shingles.append(grams)
+        return True
+
+    def lookup(self, title: str) -> Optional[str]:
+        """Get the DOI of the indexed title matching ``title``, or None."""
+        key = canonical_title(title)
+        if not key:
+            return None
+        with self._lock:
+            if key in self._dois:
+                self.hits += 1
+                return self._dois[key]
+            grams = title_shingles(key)
+            # A title with Jaccard >= threshold contains at least one of any
+            # len - ceil(threshold * len) + 1 of the query's n-grams
+            probe = len(grams) - math.ceil(self.threshold * len(grams)) + 1
+            rarest = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))[:probe]
+            candidates = set(chain.from_iterable(self._postings.get(gram, ()) for gram in rarest))
+            distinguishing = _distinguishing_tokens(key)
+            best, best_score = None, self.threshold
+            for i in candidates:
+                score = _jaccard(grams, self._shingles[i])
+                if score >= best_score and _distinguishing_tokens(self._titles[i]) == distinguishing:
+                    best, best_score = i, score
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._dois[self._titles[best]]
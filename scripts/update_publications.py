@@ -1,64 +1,456 @@
-from typing import Dict, List, Union
-import requests
-from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import http_client
 import json
 from pathlib import Path
 import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from habanero import Crossref
 import polars as pl
 import bibtexparser
-from bibtexparser.bparser import BibTexParser
+from bibtexparser.bparser import BibTexParser, STANDARD_TYPES
 from bibtexparser.customization import convert_to_unicode
 from bibtexparser.bibdatabase import BibDatabase
+from bibtex_tokenizer import SkippedEntry, iter_bibtex, parse_bibtex
+import http_replay
+import instrumentation
+from incremental import Manifest, content_hash, file_hash, write_if_changed
+from title_index import TitleDoiIndex, canonical_title, cluster_titles
+from snapshots import DEFAULT_KEEP, DEFAULT_SNAPSHOT_DIR, SnapshotStore
+from crossref_cache import CrossrefCache, MISSING, DEFAULT_CACHE_PATH, DEFAULT_SEARCH_TTL, normalize_doi
+from rate_limit import (RateLimitExceeded, RateLimiter, backoff_delay, crossref_limiter,
+                        update_from_crossref_headers)
 
-def get_orcid_works(orcid_id: str) -> List[Dict]:
-    """Fetch publications from ORCID."""
+log = logging.getLogger(__name__)
+
+# Retries of a Crossref call answered with 429 / 503 before giving up
+CROSSREF_RETRIES = 4
+# Seconds a supplemented publication is reused before going through Crossref
+# again, so it never outlives the cached lookups it was built from
+SUPPLEMENTED_TTL = DEFAULT_SEARCH_TTL
+# Version of the manifest layout written by update()
+MANIFEST_VERSION = 2
+
+# A field value closed at the end of a line and directly followed by another field
+MISSING_FIELD_COMMA = re.compile(r'\}[ \t]*\n(?=\s*\w+\s*=)')
+
+# Publication fields kept through merge_publications
+MERGE_COLUMNS = ['source', 'title', 'author', 'journal', 'year', 'doi', 'type', 'citations']
+
+# Put-codes per ORCID bulk work request (the API maximum)
+ORCID_BULK_SIZE = 100
+ORCID_HEADERS = {
+    "Accept": "application/json"
+}
+
+# DOIs resolved per Crossref request by the batch resolver
+CROSSREF_DOI_BATCH = 50
+# Work fields used when supplementing; batch lookups only ask for these
+CROSSREF_SELECT = ['DOI', 'title', 'author', 'container-title', 'published-print', 'type']
+
+# Author search: cursor-paginated /works requests, projected to the fields normalized below
+CROSSREF_HOST = "api.crossref.org"
+CROSSREF_BASE_URL = f"https://{CROSSREF_HOST}"
+CROSSREF_WORKS_URL = f"{CROSSREF_BASE_URL}/works"
+CROSSREF_ROWS = 1000
+CROSSREF_MAX_RESULTS = 2000
+CROSSREF_SEARCH_SELECT = CROSSREF_SELECT + ['issued', 'is-referenced-by-count']
+# Crossref work types -> BibTeX entry types (capitalized like get_bibtex_works' types)
+CROSSREF_BIBTEX_TYPES = {
+    'journal-article': 'Article',
+    'proceedings-article': 'Inproceedings',
+    'book': 'Book',
+    'monograph': 'Book',
+    'edited-book': 'Book',
+    'book-chapter': 'Incollection',
+    'dissertation': 'Phdthesis',
+    'report': 'Techreport',
+}
+
+def orcid_value(data: Optional[Dict], *keys: str):
+    """Walk nested ORCID fields (which may be null), returning None when any is missing."""
+    for key in keys:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+def get_orcid_work_details(orcid_id: str, put_codes: List[int], headers: Dict) -> Dict[int, Dict]:
+    """Fetch full ORCID work records through the bulk ``/works/{put-code,...}`` endpoint.
+    
+    Args:
+        orcid_id: ORCID iD
+        put_codes: Put-codes of the works to fetch
+        headers: Request headers
+        
+    Returns:
+        Dictionary mapping put-codes to work records. Works whose batch failed
+        or that ORCID reports as errors are left out.
+    """
+    details = {}
+    for start in range(0, len(put_codes), ORCID_BULK_SIZE):
+        batch = put_codes[start:start + ORCID_BULK_SIZE]
+        url = f"https://pub.orcid.org/v3.0/{orcid_id}/works/{','.join(str(pc) for pc in batch)}"
+        try:
+            response = http_client.get(url, headers=headers)
+            response.raise_for_status()
+        except Exception as e:
+            log.warning("Error fetching ORCID work details: %s", e)
+            continue
+        for item in response.json().get('bulk', []):
+            work = item.get('work')
+            if work and work.get('put-code') is not None:
+                details[work['put-code']] = work
+    return details
+
+def get_orcid_summaries(orcid_id: str) -> Optional[List[Dict]]:
+    """Fetch the ORCID work summaries (one per work group), or None if the request fails."""
     try:
         url = f"https://pub.orcid.org/v3.0/{orcid_id}/works"
-        headers = {
-            "Accept": "application/json"
-        }
-        response = requests.get(url, headers=headers)
+        response = http_client.cached_get(url, headers=ORCID_HEADERS)
         if response.status_code != 200:
             raise Exception(f"Failed to fetch data: {response.status_code}")
+        return [work['work-summary'][0] for work in response.json()['group']]
+    except Exception as e:
+        log.warning("Error fetching from ORCID: %s", e)
+        return None
+
+def get_orcid_works(orcid_id: str, summaries: List[Dict] = None, degraded: List[int] = None) -> List[Dict]:
+    """Fetch publications from ORCID, with journal and authors from the full work records.
+    
+    Args:
+        orcid_id: ORCID iD
+        summaries: Work summaries already fetched with ``get_orcid_summaries``
+        degraded: Optional list collecting the put-codes of works whose full
+            record could not be fetched, and which fell back to their summary
+        
+    Returns:
+        List of publication dictionaries
+    """
+    if degraded is None:
+        degraded = []
+    try:
+        if summaries is None:
+            summaries = get_orcid_summaries(orcid_id)
+            if summaries is None:
+                return []
         
-        works = response.json()['group']
+        details = get_orcid_work_details(
+            orcid_id, [ws['put-code'] for ws in summaries if ws.get('put-code') is not None], ORCID_HEADERS
+        )
         publications = []
         
-        for work in works:
-            work_summary = work['work-summary'][0]
+        for work_summary in summaries:
+            # The full record carries contributors and journal; fall back to the summary
+            work = details.get(work_summary.get('put-code'))
+            if work is None:
+                degraded.append(work_summary.get('put-code'))
+                work = work_summary
+            contributors = orcid_value(work, 'contributors', 'contributor') or []
             pub_data = {
-                'title': work_summary.get('title', {}).get('title', {}).get('value', ''),
-                'type': work_summary.get('type', 'Article'),
-                'year': work_summary.get('publication-date', {}).get('year', {}).get('value'),
-                'doi': next((ei['external-id-value'] for ei in work_summary.get('external-ids', {}).get('external-id', [])
+                'title': orcid_value(work, 'title', 'title', 'value') or '',
+                'type': work.get('type', 'Article'),
+                'year': orcid_value(work, 'publication-date', 'year', 'value'),
+                'doi': next((ei['external-id-value'] for ei in orcid_value(work, 'external-ids', 'external-id') or []
                            if ei['external-id-type'] == 'doi'), None),
-                'journal': '',  # ORCID doesn't always provide journal info in the summary
-                'author': [],  # ORCID doesn't always provide author info in the summary
+                'journal': orcid_value(work, 'journal-title', 'value') or '',
+                'author': [name for name in (orcid_value(c, 'credit-name', 'value') for c in contributors) if name],
                 'source': 'orcid'
             }
-            print(f"\nFound ORCID publication: {pub_data['title'][:100]}")
+            log.debug("Found ORCID publication: %s", pub_data['title'][:100])
             publications.append(pub_data)
         
         return publications
     except Exception as e:
-        print(f"Error fetching from ORCID: {e}")
+        log.warning("Error fetching from ORCID: %s", e)
+        degraded.extend(ws.get('put-code') for ws in summaries or [])
         return []
 
-def get_crossref_works(author_name: str, mailto: str = None) -> List[Dict]:
+def crossref_client(mailto: str = None) -> Crossref:
+    """Create the habanero Crossref client, pointed at the replay server when one runs."""
+    return Crossref(base_url=http_client.replay_url(CROSSREF_BASE_URL), mailto=mailto)
+
+def crossref_year(work: Dict) -> Optional[str]:
+    """Get a Crossref work's year, preferring the print publication date."""
+    for field in ('published-print', 'issued'):
+        parts = (work.get(field) or {}).get('date-parts') or [[None]]
+        if parts[0] and parts[0][0]:
+            return str(parts[0][0])
+    return None
+
+def crossref_work_to_pub(work: Dict) -> Dict:
+    """Convert a Crossref work record to the publication dictionary shape of ``get_bibtex_works``."""
+    titles = work.get('title') or ['']
+    journals = work.get('container-title') or ['']
+    authors = [f"{a.get('given', '')} {a.get('family', '')}".strip() for a in work.get('author', [])]
+    return {
+        'title': titles[0],
+        'author': [a for a in authors if a],
+        'journal': journals[0],
+        'year': crossref_year(work),
+        'doi': work.get('DOI', ''),
+        'type': CROSSREF_BIBTEX_TYPES.get(work.get('type'), 'Misc'),
+        'source': 'crossref',
+        'citations': work.get('is-referenced-by-count', 0),
+    }
+
+def iter_crossref_works(author_name: str, mailto: str = None, limiter: RateLimiter = None,
+                        rows: int = CROSSREF_ROWS, max_results: int = CROSSREF_MAX_RESULTS) -> Iterator[Dict]:
+    """Stream every Crossref work matching an author search, page by page.
+    
+    Pages are requested with a deep-paging cursor and ``select`` so that only
+    the fields used here are sent, and each record is normalized as its page
+    arrives.
+    
+    Args:
+        author_name: Author to search for
+        mailto: Contact address, to use Crossref's polite pool
+        limiter: Rate limiter for Crossref calls; one for ``mailto``'s pool by default
+        rows: Records per page (Crossref allows up to 1000)
+        max_results: Stop after this many records, since author queries are fuzzy
+            and the tail of the results rarely matches the author
+        
+    Returns:
+        Iterator over publication dictionaries
+    """
+    limiter = limiter or crossref_limiter(mailto)
+    params = {
+        'query.author': author_name,
+        'rows': min(rows, max_results),
+        'select': ','.join(CROSSREF_SEARCH_SELECT),
+        'cursor': '*',
+    }
+    if mailto:
+        params['mailto'] = mailto
+    
+    def fetch_page():
+        response = http_client.get(CROSSREF_WORKS_URL, params=params)
+        response.raise_for_status()
+        return response
+    
+    count = 0
+    while count < max_results:
+        response = call_crossref(fetch_page, limiter, host=None)
+        update_from_crossref_headers(limiter, response.headers)
+        message = response.json()['message']
+        items = message.get('items', [])
+        for work in items[:max_results - count]:
+            yield crossref_work_to_pub(work)
+        count += len(items)
+        cursor = message.get('next-cursor')
+        if not items or not cursor or count >= message.get('total-results', 0):
+            break
+        params['cursor'] = cursor
+
+def get_crossref_works(author_name: str, mailto: str = None,
+                       max_results: int = CROSSREF_MAX_RESULTS) -> List[Dict]:
     """Fetch publications from Crossref."""
+    works = []
     try:
-        cr = Crossref(mailto=mailto)
-        works = cr.works(query_author=author_name, limit=100)
-        return works['message']['items']
+        for pub in iter_crossref_works(author_name, mailto, max_results=max_results):
+            works.append(pub)
     except Exception as e:
-        print(f"Error fetching from Crossref: {e}")
-        return []
+        log.warning("Error fetching from Crossref: %s", e)
+    log.info("Fetched %d publications from Crossref", len(works))
+    return works
+
+def error_response(error: Exception):
+    """Get the HTTP response behind a failed Crossref call, if the error carries one."""
+    for exc in (error, error.__cause__):
+        response = getattr(exc, 'response', None)
+        if response is not None:
+            return response
+    return None
+
+def error_status(error: Exception) -> Optional[int]:
+    """Get the HTTP status code of a failed Crossref call, if known."""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        response = error_response(error)
+        status = getattr(response, 'status_code', None)
+    return status
+
+def call_crossref(request: Callable[[], Dict], limiter: RateLimiter = None, retries: int = CROSSREF_RETRIES,
+                  host: Optional[str] = CROSSREF_HOST) -> Dict:
+    """Run a Crossref call under the rate limiter, backing off and retrying when throttled.
+    
+    Args:
+        request: Function making one Crossref call
+        limiter: Rate limiter shared by all Crossref calls of the run
+        retries: Number of retries after a 429 / 503 answer
+        host: Host the call is counted against in the request statistics, or
+            None for calls made through ``http_client``, which counts them itself
+        
+    Returns:
+        The call's result
+    """
+    def timed_request():
+        if host is None:
+            return request()
+        start = time.perf_counter()
+        status = None
+        try:
+            result = request()
+            status = 200
+            return result
+        except Exception as e:
+            status = error_status(e)
+            raise
+        finally:
+            instrumentation.record_request(host, time.perf_counter() - start, status)
+    
+    for attempt in range(retries + 1):
+        try:
+            if limiter is None:
+                return timed_request()
+            with limiter.slot():
+                return timed_request()
+        except Exception as e:
+            if error_status(e) not in (429, 503) or attempt == retries:
+                raise
+            response = error_response(e)
+            headers = getattr(response, 'headers', None) or {}
+            if limiter:
+                update_from_crossref_headers(limiter, headers)
+            retry_after = headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else backoff_delay(attempt)
+            log.warning("Crossref throttled the request, retrying in %.1fs", delay)
+            if limiter:
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
+
+def has_valid_doi(pub: Dict) -> bool:
+    """Check whether a publication carries a usable DOI."""
+    return bool(pub.get('doi') and pub.get('doi') != '"none"')
+
+def needs_crossref(pub: Dict) -> bool:
+    """Check whether a publication is missing any field Crossref could fill in."""
+    return not (pub.get('author') and pub.get('title') and pub.get('journal')
+                and pub.get('year') and has_valid_doi(pub))
 
-def supplement_with_crossref(pub: Dict, cr: Crossref = None) -> Dict:
-    """Supplement a publication entry with data from Crossref."""
+def resolve_crossref_dois(dois: List[str], cr: Crossref, cache: CrossrefCache = None, limiter: RateLimiter = None,
+                          batch_size: int = CROSSREF_DOI_BATCH) -> Dict[str, Optional[Dict]]:
+    """Fetch the Crossref records of many DOIs with a few ``filter=doi:...`` queries.
+    
+    DOIs already in the cache are answered from it without a request. DOIs a
+    successful batch does not return are mapped to None, meaning Crossref does
+    not know them, and cached as missing. DOIs in a failed batch, or containing
+    a comma (which the filter syntax cannot carry), are left out so that they
+    fall back to the single-DOI lookup.
+    
+    Args:
+        dois: DOIs to resolve
+        cr: Crossref client
+        cache: Optional Crossref cache, filled with the fetched records
+        limiter: Rate limiter for Crossref calls
+        batch_size: Number of DOIs per request
+        
+    Returns:
+        Dictionary mapping normalized DOIs to work records (or None)
+    """
+    resolved: Dict[str, Optional[Dict]] = {}
+    pending = []
+    for doi in dict.fromkeys(normalize_doi(d) for d in dois if d):
+        if ',' in doi:
+            continue
+        # Cached DOIs go into the result so the single-DOI lookup does not read them again
+        cached = cache.get_work(doi) if cache else None
+        if cached is not None:
+            resolved[doi] = None if cached is MISSING else cached
+            continue
+        pending.append(doi)
+    
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        log.debug("Resolving %d DOIs from Crossref in one request", len(batch))
+        try:
+            works = call_crossref(
+                lambda: cr.works(filter={'doi': batch}, limit=len(batch), select=CROSSREF_SELECT),
+                limiter
+            )
+        except Exception as e:
+            log.warning("Batch DOI lookup failed: %s", e)
+            continue
+        
+        found = {normalize_doi(item['DOI']): item
+                 for item in works.get('message', {}).get('items', []) if item.get('DOI')}
+        for doi in batch:
+            resolved[doi] = found.get(doi)
+            if cache:
+                cache.put_work(doi, found.get(doi))
+    return resolved
+
+def lookup_crossref_doi(doi: str, cr: Crossref, cache: CrossrefCache = None,
+                        limiter: RateLimiter = None, resolved: Dict[str, Optional[Dict]] = None) -> Optional[Dict]:
+    """Get the Crossref work record for a DOI, from batch results or the cache when possible."""
+    if resolved and normalize_doi(doi) in resolved:
+        return resolved[normalize_doi(doi)]
+    if cache:
+        cached = cache.get_work(doi)
+        if cached is MISSING:
+            return None
+        if cached is not None:
+            return cached
+    
+    log.debug("Looking up DOI: %s", doi)
+    try:
+        works = call_crossref(lambda: cr.works(ids=[doi]), limiter)
+    except Exception as e:
+        log.warning("DOI lookup failed: %s", e)
+        if cache and error_status(e) == 404:
+            cache.put_work(doi, None)
+        return None
+    
+    cr_work = works['message'] if works and works.get('message') else None
+    if cache and cr_work:
+        cache.put_work(doi, cr_work)
+    return cr_work
+
+def first_value(value: Union[str, List[str]]) -> str:
+    """Get the first element of a Crossref list field, or the value itself if it is a string."""
+    return value[0] if isinstance(value, list) else value
+
+def search_crossref_title(query: str, cr: Crossref, cache: CrossrefCache = None,
+                          limiter: RateLimiter = None) -> List[Dict]:
+    """Search Crossref for a title, returning the top result items (cached when possible)."""
+    if cache:
+        cached = cache.get_search(query)
+        if cached is not None:
+            return cached
+    
+    log.debug("Searching Crossref for: %s...", query[:100])
+    works = call_crossref(lambda: cr.works(query=query, limit=5), limiter)
+    items = works.get('message', {}).get('items') or []
+    if cache:
+        cache.put_search(query, items)
+        # The items are full work records, so a later lookup of their DOIs needs no call
+        for item in items:
+            if item.get('DOI'):
+                cache.put_work(item['DOI'], item)
+    return items
+
+def supplement_with_crossref(pub: Dict, cr: Crossref = None, cache: CrossrefCache = None,
+                             limiter: RateLimiter = None, resolved: Dict[str, Optional[Dict]] = None,
+                             titles: TitleDoiIndex = None, failed: List[Dict] = None) -> Dict:
+    """Supplement a publication entry with data from Crossref.
+    
+    DOI records and title search results are read from and written to ``cache``
+    when one is given, so known works need no Crossref call on later runs.
+    Crossref calls are paced by ``limiter`` when one is given. ``resolved`` holds
+    records already fetched by ``resolve_crossref_dois``. Entries without a DOI
+    are first matched against ``titles`` and only searched on Crossref when
+    that finds nothing; works found on Crossref are added to it. Entries whose
+    supplementation raised are returned as they are and appended to ``failed``.
+    """
     if not cr:
-        cr = Crossref()
+        cr = crossref_client()
     
     try:
         # Skip supplementation if we have all important fields
@@ -66,40 +458,44 @@ def supplement_with_crossref(pub: Dict, cr: Crossref = None) -> Dict:
         has_title = bool(pub.get('title'))
         has_journal = bool(pub.get('journal'))
         has_year = bool(pub.get('year'))
-        has_doi = bool(pub.get('doi') and pub.get('doi') != '"none"')
+        has_doi = has_valid_doi(pub)
         
         # Always ensure authors are properly formatted first
         if has_authors and isinstance(pub.get('author'), str):
             pub['author'] = pub['author'].split(' and ')
         
-        if has_authors and has_title and has_journal and has_year and has_doi:
+        if not needs_crossref(pub):
             return pub
             
         # Try to find the work in Crossref, preferring DOI lookup
         cr_work = None
-        if pub.get('doi') and pub.get('doi') != '"none"':
-            print(f"\nLooking up DOI: {pub['doi']}")
-            try:
-                works = cr.works(ids=[pub['doi']])
-                if works and works.get('message'):
-                    cr_work = works['message']
-            except Exception as e:
-                print(f"DOI lookup failed: {e}")
+        if has_doi:
+            cr_work = lookup_crossref_doi(pub['doi'], cr, cache, limiter, resolved)
+        
+        # Then a title known from earlier results
+        query = pub.get('title', '')
+        if not cr_work and query and titles is not None:
+            doi = titles.lookup(query)
+            if doi:
+                log.debug("Matched title locally to DOI %s", doi)
+                cr_work = lookup_crossref_doi(doi, cr, cache, limiter, resolved)
         
         # Fall back to title search if DOI lookup fails or we don't have a DOI
         if not cr_work:
-            query = pub.get('title', '')
             if not query:
                 return pub
                 
-            print(f"\nSearching Crossref for: {query[:100]}...")
-            works = cr.works(query=query, limit=5)
-            if not works.get('message', {}).get('items'):
+            items = search_crossref_title(query, cr, cache, limiter)
+            if not items:
                 return pub
+            if titles is not None:
+                for item in items:
+                    if item.get('title') and item.get('DOI'):
+                        titles.add(first_value(item['title']), item['DOI'])
             
             # Try to find exact title match
             query_lower = query.lower()
-            for item in works['message']['items']:
+            for item in items:
                 if not item.get('title'):
                     continue
                 item_title = item['title'][0].lower() if isinstance(item['title'], list) else item['title'].lower()
@@ -110,10 +506,12 @@ def supplement_with_crossref(pub: Dict, cr: Crossref = None) -> Dict:
                     break
             
             if not cr_work:
-                print("No exact title match found")
+                log.debug("No exact title match found")
                 return pub
         
-        print(f"Found Crossref match: {cr_work.get('title', [''])[0][:100]}")
+        log.debug("Found Crossref match: %s", cr_work.get('title', [''])[0][:100])
+        if titles is not None and cr_work.get('title') and cr_work.get('DOI'):
+            titles.add(first_value(cr_work['title']), cr_work['DOI'])
         
         # Supplement missing fields
         if not has_title and cr_work.get('title'):
@@ -122,11 +520,11 @@ def supplement_with_crossref(pub: Dict, cr: Crossref = None) -> Dict:
         # For authors, only supplement if missing or empty
         existing_authors = pub.get('author', [])
         if (not has_authors or len(existing_authors) == 0) and cr_work.get('author'):
-            print(f"Original authors: {existing_authors}")
+            log.debug("Original authors: %s", existing_authors)
             cr_authors = [f"{a.get('given', '')} {a.get('family', '')}".strip() 
                         for a in cr_work['author']]
             cr_authors = [a for a in cr_authors if a]  # Remove empty author names
-            print(f"Adding Crossref authors: {cr_authors}")
+            log.debug("Adding Crossref authors: %s", cr_authors)
             pub['author'] = cr_authors
         elif has_authors and isinstance(pub.get('author'), str):
             # If authors exist but are in string format, convert to list
@@ -147,132 +545,141 @@ def supplement_with_crossref(pub: Dict, cr: Crossref = None) -> Dict:
             pub['type'] = cr_work.get('type', 'Article').capitalize()
             
     except Exception as e:
-        print(f"Error supplementing with Crossref: {e}")
+        log.warning("Error supplementing with Crossref: %s", e)
+        if failed is not None:
+            failed.append(pub)
     
     return pub
 
+def iter_bibtex_entries(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """Split BibTeX text into raw entries, one ``@``-block at a time.
+    
+    Args:
+        lines: Lines of BibTeX, e.g. an open file or ``io.StringIO``
+        
+    Returns:
+        Iterator over (first line number, raw text) of each entry
+    """
+    entry: List[str] = []
+    start = 0
+    for line_no, line in enumerate(lines, 1):
+        if line.lstrip().startswith('@'):
+            if entry:
+                yield start, ''.join(entry)
+            entry = []
+            start = line_no
+        if start:
+            entry.append(line)
+    if entry:
+        yield start, ''.join(entry)
+
+def repair_bibtex_entry(entry: str) -> str:
+    """Fix common syntax errors in one raw BibTeX entry."""
+    # Add missing commas after a field value when another field follows
+    entry = MISSING_FIELD_COMMA.sub('},\n', entry)
+    return entry.replace('publisher={', 'publisher = {')
+
+def bibtex_entry_to_pub(entry: Dict) -> Dict:
+    """Convert a parsed BibTeX entry to a publication dictionary."""
+    author_str = entry.get('author', '')
+    
+    # Clean up DOI if it has quotes or is 'none'
+    doi = entry.get('doi', '')
+    if doi:
+        doi = doi.strip('"')
+        if doi.lower() == 'none':
+            doi = ''
+    
+    return {
+        'title': entry.get('title', ''),
+        'author': author_str.split(' and ') if author_str else [],
+        'journal': entry.get('journal', entry.get('booktitle', '')),
+        'year': entry.get('year'),
+        'doi': doi,
+        'type': entry.get('ENTRYTYPE', 'Article').capitalize(),
+        'source': 'bibtex'  # Mark source for merge logic
+    }
+
+def iter_bibtex_works(lines: Iterable[str], skipped: List[SkippedEntry] = None) -> Iterator[Dict]:
+    """Parse BibTeX entry by entry, yielding publication dictionaries.
+    
+    Each raw entry is repaired and handed to bibtexparser on its own, so the
+    text is never copied as a whole and a broken entry only affects itself:
+    entries bibtexparser rejects go through the brace-aware fallback tokenizer,
+    and entries that fail there too are reported and skipped.
+    Entries whose lowercase title was already seen are skipped.
+    
+    Args:
+        lines: Lines of BibTeX, e.g. an open file or ``io.StringIO``
+        skipped: Optional list collecting the entries that could not be parsed
+        
+    Returns:
+        Iterator over publication dictionaries
+    """
+    if skipped is None:
+        skipped = []
+    parser = BibTexParser()
+    parser.customization = convert_to_unicode
+    parser.expect_multiple_parse = True
+    normalized_titles = set()  # For deduplication
+    
+    for line_no, raw_entry in iter_bibtex_entries(lines):
+        fixed_entry = repair_bibtex_entry(raw_entry)
+        try:
+            entries = parser.parse(fixed_entry).entries
+            manual = False
+            # bibtexparser silently drops standard entries it cannot read
+            entry_type = re.match(r'\s*@(\w+)', raw_entry)
+            if not entries and entry_type and entry_type.group(1).lower() in STANDARD_TYPES:
+                raise ValueError("entry was not recognized")
+        except Exception as e:
+            log.debug("Error parsing BibTeX entry at line %d, attempting manual parsing: %s", line_no, e)
+            entries = []
+            for item in iter_bibtex(fixed_entry, line_no):
+                if isinstance(item, SkippedEntry):
+                    log.debug("Skipping unparseable BibTeX entry %s (line %d): %s", item.key, item.line, item.reason)
+                    skipped.append(item)
+                else:
+                    entries.append(item)
+            manual = True
+        finally:
+            # Only the @string macros have to carry over to the next entry
+            parser.bib_database.entries = []
+            parser.bib_database.comments.clear()
+            parser.bib_database.preambles.clear()
+        
+        for entry in entries:
+            pub_data = bibtex_entry_to_pub(entry)
+            title = pub_data['title'].lower().strip()
+            if title in normalized_titles:
+                log.debug("Skipping duplicate entry: %s", title[:100])
+                continue
+            if title or not manual:
+                normalized_titles.add(title)
+            
+            log.debug("Found BibTeX publication%s: %s", ' (manual parsing)' if manual else '', pub_data['title'][:100])
+            log.debug("  Authors: %s", pub_data['author'])
+            log.debug("  DOI: %s", pub_data['doi'])
+            yield pub_data
+
 def get_bibtex_works(bibtex_file: str) -> List[Dict]:
     """Fetch publications from BibTeX file."""
     try:
         if not Path(bibtex_file).exists():
-            print(f"Creating empty BibTeX file: {bibtex_file}")
+            log.info("Creating empty BibTeX file: %s", bibtex_file)
             Path(bibtex_file).touch()
             return []
-            
-        # First, try to fix common BibTeX syntax errors
-        with open(bibtex_file, 'r', encoding='utf-8') as bibfile:
-            content = bibfile.read()
-            
-        # Fix missing commas after DOI
-        fixed_content = content
-        fixed_content = fixed_content.replace('}\n', '},\n', 50)  # Replace up to 50 occurrences
-        fixed_content = fixed_content.replace('publisher={', 'publisher = {', 50)
-        
-        # Create a temporary file with fixed content
-        temp_bibtex = Path(bibtex_file).parent / f"temp_{Path(bibtex_file).name}"
-        with open(temp_bibtex, 'w', encoding='utf-8') as f:
-            f.write(fixed_content)
-            
-        # Now parse the fixed file
-        publications = []
-        normalized_titles = set()  # For deduplication
-        
-        try:
-            with open(temp_bibtex, 'r', encoding='utf-8') as bibfile:
-                parser = BibTexParser()
-                parser.customization = convert_to_unicode
-                bib_database = bibtexparser.load(bibfile, parser=parser)
-                
-                for entry in bib_database.entries:
-                    # Check for missing comma in the original bibtex (common issue)
-                    author_str = entry.get('author', '')
-                    
-                    # Clean up DOI if it has quotes or is 'none'
-                    doi = entry.get('doi', '')
-                    if doi:
-                        doi = doi.strip('"')
-                        if doi.lower() == 'none':
-                            doi = ''
-                    
-                    title = entry.get('title', '').lower().strip()
-                    if title in normalized_titles:
-                        print(f"\nSkipping duplicate entry: {title[:100]}")
-                        continue
-                    
-                    normalized_titles.add(title)
-                    
-                    pub_data = {
-                        'title': entry.get('title', ''),
-                        'author': author_str.split(' and ') if author_str else [],
-                        'journal': entry.get('journal', entry.get('booktitle', '')),
-                        'year': entry.get('year'),
-                        'doi': doi,
-                        'type': entry.get('ENTRYTYPE', 'Article').capitalize(),
-                        'source': 'bibtex'  # Mark source for merge logic
-                    }
-                    
-                    publications.append(pub_data)
-                    print(f"\nFound BibTeX publication: {pub_data['title'][:100]}")
-                    print(f"  Authors: {pub_data['author']}")
-                    print(f"  DOI: {pub_data['doi']}")
-        
-        except Exception as e:
-            print(f"Error parsing fixed BibTeX file: {e}")
-            # Try a more robust, manual approach
-            print("Attempting manual BibTeX parsing...")
-            
-            with open(bibtex_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Find all BibTeX entries
-            import re
-            entries = re.findall(r'@(\w+)\{([^,]+),(.*?)\}', content, re.DOTALL)
-            
-            for entry_type, entry_key, entry_content in entries:
-                # Extract fields
-                fields = {}
-                for field_match in re.finditer(r'\s*(\w+)\s*=\s*\{([^}]*)\}', entry_content):
-                    field_name, field_value = field_match.groups()
-                    fields[field_name.lower()] = field_value
-                
-                # Create publication data
-                title = fields.get('title', '')
-                if title.lower().strip() in normalized_titles:
-                    print(f"\nSkipping duplicate entry: {title[:100]}")
-                    continue
-                
-                if title:
-                    normalized_titles.add(title.lower().strip())
-                
-                author_str = fields.get('author', '')
-                doi = fields.get('doi', '')
-                if doi:
-                    doi = doi.strip('"')
-                    if doi.lower() == 'none':
-                        doi = ''
-                
-                pub_data = {
-                    'title': title,
-                    'author': author_str.split(' and ') if author_str else [],
-                    'journal': fields.get('journal', fields.get('booktitle', '')),
-                    'year': fields.get('year'),
-                    'doi': doi,
-                    'type': entry_type.capitalize(),
-                    'source': 'bibtex'
-                }
-                
-                publications.append(pub_data)
-                print(f"\nFound BibTeX publication (manual parsing): {pub_data['title'][:100]}")
-                print(f"  Authors: {pub_data['author']}")
-                print(f"  DOI: {pub_data['doi']}")
-        
-        # Clean up the temporary file
-        if temp_bibtex.exists():
-            temp_bibtex.unlink()
         
+        skipped: List[SkippedEntry] = []
+        with open(bibtex_file, 'r', encoding='utf-8') as bibfile:
+            publications = list(iter_bibtex_works(bibfile, skipped))
+        if skipped:
+            log.warning("Skipped %d unparseable BibTeX entries in %s:", len(skipped), bibtex_file)
+            for item in skipped:
+                log.warning("  %s (line %d): %s", item.key, item.line, item.reason)
         return publications
     except Exception as e:
-        print(f"Error reading BibTeX file: {e}")
+        log.error("Error reading BibTeX file: %s", e)
         return []
 
 def format_authors(authors: Union[List[Dict], List[str]], highlight_name: str) -> str:
@@ -370,9 +777,13 @@ def format_publication(pub: Dict, highlight_name: str) -> str:
     
     return content
 
-def generate_publications_page(pubs: List[Dict], highlight_name: str, from_year: int = None) -> str:
-    """Generate the full publications page content."""
-    # Convert to Polars DataFrame for efficient processing
+def iter_publications_page(pubs: List[Dict], highlight_name: str, from_year: int = None) -> Iterator[str]:
+    """Yield the publications page content block by block.
+    
+    The publications are sorted once and split into years with a single
+    ``partition_by``, so each year's entries are rendered without rescanning
+    the whole table. Blocks are meant to be joined with newlines.
+    """
     df = pl.DataFrame(pubs)
     
     # Extract year from different formats and convert to integer
@@ -380,45 +791,63 @@ def generate_publications_page(pubs: List[Dict], highlight_name: str, from_year:
         df = df.with_columns(pl.col('year').cast(pl.Int64))
     elif 'published-print' in df.columns:
         df = df.with_columns(
-            pl.struct('published-print').map_elements(
-                lambda x: x.get('date-parts', [[None]])[0][0]
-            ).alias('year')
+            pl.col('published-print').struct.field('date-parts').list.first().list.first()
+            .cast(pl.Int64).alias('year')
         )
     
-    # Filter by year if specified
-    if from_year is not None:
-        df = df.filter(pl.col('year') >= from_year)
-    
-    # Sort by year and citations (if available)
-    if 'citations' in df.columns:
-        df = df.sort(['year', 'citations'], descending=True)
-    else:
-        df = df.sort('year', descending=True)
+    yield "# Publications\n\n## Featured Publications\n"
     
-    # Generate content
-    content = ["# Publications\n\n## Featured Publications\n"]
-    
-    # Process each year
-    for year in df.get_column('year').unique().sort(descending=True):
-        if year is None:
-            continue
-            
-        content.append(f"\n### {year}")
-        year_pubs = df.filter(pl.col('year') == year).to_dicts()
+    rendered = 0
+    if 'year' in df.columns:
+        # Filter by year if specified
+        df = df.filter(pl.col('year').is_not_null())
+        if from_year is not None:
+            df = df.filter(pl.col('year') >= from_year)
+        
+        # Sort by year and citations (if available)
+        sort_by = ['year', 'citations'] if 'citations' in df.columns else ['year']
+        df = df.sort(sort_by, descending=True, maintain_order=True)
         
-        # Format each publication
-        for pub in year_pubs:
-            formatted = format_publication(pub, highlight_name)
-            if formatted:
-                content.append(formatted)
+        for year_df in df.partition_by('year', maintain_order=True):
+            yield f"\n### {year_df['year'][0]}"
+            for pub in year_df.iter_rows(named=True):
+                formatted = format_publication(pub, highlight_name)
+                if formatted:
+                    rendered += 1
+                    yield formatted
     
-    if len(content) <= 3:  # Only has header sections
+    if not rendered:
         if from_year:
-            content.append(f"\nNo publications found from {from_year} onwards.")
+            yield f"\nNo publications found from {from_year} onwards."
         else:
-            content.append("\nNo publications found.")
+            yield "\nNo publications found."
+
+def generate_publications_page(pubs: List[Dict], highlight_name: str, from_year: int = None) -> str:
+    """Generate the full publications page content."""
+    return "\n".join(iter_publications_page(pubs, highlight_name, from_year))
+
+def write_publications_page(output: Path, pubs: List[Dict], highlight_name: str, from_year: int = None) -> bool:
+    """Write the publications page to ``output`` as it is rendered, without building it in memory.
+    
+    The page is streamed to a temporary file and only replaces ``output`` if
+    its content differs, so an unchanged page keeps its mtime.
     
-    return "\n".join(content)
+    Returns:
+        True if ``output`` was written
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.tmp")
+    digest = hashlib.sha256()
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for i, block in enumerate(iter_publications_page(pubs, highlight_name, from_year)):
+            chunk = f"\n{block}" if i else block
+            digest.update(chunk.encode('utf-8'))
+            f.write(chunk)
+    if output.exists() and file_hash(output) == digest.hexdigest():
+        tmp.unlink()
+        return False
+    os.replace(tmp, output)
+    return True
 
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
@@ -479,6 +908,76 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Clear the output files before writing"
     )
+    parser.add_argument(
+        "-w", "--crossref-workers",
+        type=int,
+        default=3,
+        help="Number of publications to supplement from Crossref concurrently"
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=Path,
+        default=DEFAULT_SNAPSHOT_DIR,
+        help="Directory of supplemented BibTeX snapshots (kept out of docs/ so the site build skips them)"
+    )
+    parser.add_argument(
+        "--keep-snapshots",
+        type=int,
+        default=DEFAULT_KEEP,
+        help="Number of most recent supplemented BibTeX snapshots to keep"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=Path(".cache/publications_manifest.json"),
+        help="Manifest of the previous run, used to only redo work for changed inputs"
+    )
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Ignore the manifest and rebuild everything"
+    )
+    parser.add_argument(
+        "--crossref-max-results",
+        type=int,
+        default=CROSSREF_MAX_RESULTS,
+        help="Maximum number of works to read from the Crossref author search"
+    )
+    parser.add_argument(
+        "--crossref-cache",
+        type=Path,
+        default=DEFAULT_CACHE_PATH,
+        help="SQLite file caching Crossref DOI records and title searches"
+    )
+    parser.add_argument(
+        "--no-crossref-cache",
+        action="store_true",
+        help="Do not read or write the Crossref cache"
+    )
+    parser.add_argument(
+        "--refresh-crossref",
+        action="store_true",
+        help="Invalidate the Crossref cache before running"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=http_client.DEFAULT_CACHE_DIR,
+        help="Directory for the conditional-request cache of API responses"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=http_client.DEFAULT_CACHE_TTL / 3600,
+        help="Hours a cached API response may be revalidated before it is dropped"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not cache API responses"
+    )
+    http_replay.add_arguments(parser)
+    instrumentation.add_arguments(parser, "update_publications")
     return parser.parse_args()
 
 def clear_file(file_path: Path) -> None:
@@ -488,150 +987,209 @@ def clear_file(file_path: Path) -> None:
     file_path.parent.mkdir(parents=True, exist_ok=True)
     file_path.touch()
 
-def merge_publications(pubs_list: List[List[Dict]], cr: Crossref = None) -> List[Dict]:
-    """Merge publications from different sources, supplementing BibTeX entries with additional data."""
-    if not pubs_list:
+def supplement_publications(pubs: List[Dict], cr: Crossref = None, cache: CrossrefCache = None,
+                            workers: int = 1, limiter: RateLimiter = None,
+                            supplemented: Dict[str, Dict] = None, titles: TitleDoiIndex = None,
+                            failed: List[Dict] = None) -> List[Dict]:
+    """Supplement publications with Crossref data, up to ``workers`` at a time.
+    
+    Args:
+        pubs: Merged publications
+        cr: Crossref client
+        cache: Optional Crossref cache
+        workers: Number of publications supplemented concurrently
+        limiter: Rate limiter for Crossref calls; defaults to Crossref's pool limits
+        supplemented: Optional map from the content hash of a merged publication to
+            its supplemented version (``pub``) and the time it was stored
+            (``stored_at``). Entries younger than ``SUPPLEMENTED_TTL`` are reused
+            as they are; the other publications are supplemented, and added to
+            it when the result is complete and no error occurred, so incomplete
+            ones go through the Crossref cache again on the next run.
+        titles: Optional title -> DOI index consulted before Crossref title searches
+        failed: Optional list collecting the publications whose supplementation raised
+        
+    Returns:
+        Supplemented publications, in the same order as ``pubs``
+    """
+    if supplemented is not None:
+        now = time.time()
+        hashes = [content_hash(pub) for pub in pubs]
+        results = {h: supplemented[h]['pub'] for h in hashes
+                   if h in supplemented and now - supplemented[h]['stored_at'] <= SUPPLEMENTED_TTL}
+        todo = {h: pub for h, pub in zip(hashes, pubs) if h not in results}
+        log.info("Reusing %d supplemented publications, supplementing %d", len(pubs) - len(todo), len(todo))
+        instrumentation.record_cache('supplemented', len(pubs) - len(todo), len(todo))
+        errors = []
+        new_results = supplement_publications(list(todo.values()), cr, cache, workers, limiter,
+                                              titles=titles, failed=errors)
+        error_ids = {id(pub) for pub in errors}
+        for h, result in zip(todo, new_results):
+            results[h] = result
+            if not needs_crossref(result) and id(result) not in error_ids:
+                supplemented[h] = {'pub': result, 'stored_at': now}
+        if failed is not None:
+            failed.extend(errors)
+        return [results[h] for h in hashes]
+    
+    if not pubs:
         return []
+    if not cr:
+        cr = crossref_client()
+    if limiter is None:
+        limiter = crossref_limiter(getattr(cr, 'mailto', None))
     
-    # Keep track of all input bibtex entries to ensure none are lost
-    bibtex_entries = []
-    if pubs_list and pubs_list[0]:
-        bibtex_entries = [p for p in pubs_list[0] if p.get('source') == 'bibtex']
-    
-    # Convert to Polars DataFrame
-    all_pubs = []
-    for pubs in pubs_list:
-        if pubs:  # Only process non-empty lists
-            # Ensure citations field exists
-            for pub in pubs:
-                if 'citations' not in pub:
-                    pub['citations'] = 0
-                if 'source' not in pub:
-                    pub['source'] = 'other'
-                print(f"\nProcessing publication from {pub['source']}: {pub.get('title', '')[:100]}")
-                print(f"Authors: {pub.get('author', [])}")
-            
-            df = pl.DataFrame(pubs)
-            
-            # Normalize titles and DOIs for matching
-            if 'title' in df.columns:
-                df = df.with_columns([
-                    pl.col('title').map_elements(
-                        lambda x: x[0].lower() if isinstance(x, list) else str(x).lower(),
-                        return_dtype=pl.Utf8
-                    ).alias('normalized_title'),
-                    pl.col('doi').map_elements(
-                        lambda x: str(x).lower() if x else '',
-                        return_dtype=pl.Utf8
-                    ).alias('normalized_doi')
-                ])
-                
-                # Convert to dicts and add to all_pubs
-                all_pubs.extend(df.to_dicts())
+    # Resolve the DOIs of every incomplete entry in bulk before supplementing
+    resolved = resolve_crossref_dois(
+        [pub['doi'] for pub in pubs if has_valid_doi(pub) and needs_crossref(pub)],
+        cr, cache, limiter
+    )
+    
+    def supplement(pub: Dict) -> Dict:
+        log.debug("Merged publication: %s", pub.get('title', '')[:100])
+        log.debug("Pre-supplement authors: %s", pub.get('author', []))
+        supplemented = supplement_with_crossref(pub, cr, cache, limiter, resolved, titles, failed)
+        log.debug("Post-supplement authors: %s", supplemented.get('author', []))
+        return supplemented
+    
+    if workers <= 1 or len(pubs) <= 1:
+        return [supplement(pub) for pub in pubs]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(supplement, pubs))
+
+def canonical_titles(titles: pl.Series) -> pl.Series:
+    """Vectorized ``title_index.canonical_title``.
+    
+    Plain ASCII titles are canonicalized with string expressions; the few
+    titles with accents, or made only of markup and punctuation, go through
+    ``canonical_title`` itself.
+    """
+    keys = (
+        titles.str.replace_all(r'\\(?:[a-zA-Z]+|.)\s*', '')
+        .str.to_lowercase()
+        # Only runs other than a single space are replaced, which skips most of each title
+        .str.replace_all(r'[^a-z0-9 ][^a-z0-9]*| [^a-z0-9]+', ' ')
+        .str.strip_chars()
+    )
+    special = (titles.str.contains(r'[^\x00-\x7F]') | (keys == '')).fill_null(False)
+    if special.any():
+        odd = titles.filter(special)
+        keys = keys.scatter(special.arg_true(), odd.replace_strict({title: canonical_title(title) for title in odd.unique()}))
+    return keys
+
+def publications_frame(pubs: List[Dict], source_index: int) -> Optional[pl.DataFrame]:
+    """Load one source's publications into a frame with the merge schema.
+    
+    Titles given as lists (Crossref style) keep their first element, author
+    strings are split on ``and``, and missing ``source`` / ``citations`` get
+    their defaults. Sources without titles cannot be merged and give None.
+    """
+    df = pl.DataFrame(pubs, infer_schema_length=None)
+    if 'title' not in df.columns:
+        return None
     
-    # Create DataFrame from all publications
-    if not all_pubs:
+    missing = [pl.lit(None).alias(col) for col in MERGE_COLUMNS if col not in df.columns]
+    df = df.with_columns(missing)
+    title = pl.col('title').list.first() if isinstance(df.schema['title'], pl.List) else pl.col('title')
+    author = pl.col('author')
+    if df.schema['author'] == pl.Utf8:
+        author = author.str.split(' and ')
+    return df.select(
+        title.cast(pl.Utf8).alias('title'),
+        author.cast(pl.List(pl.Utf8)).alias('author'),
+        pl.col('journal').cast(pl.Utf8),
+        pl.col('year').cast(pl.Utf8),
+        pl.col('doi').cast(pl.Utf8),
+        pl.col('type').cast(pl.Utf8),
+        pl.col('source').cast(pl.Utf8).fill_null('other'),
+        pl.col('citations').cast(pl.Int64).fill_null(0),
+        pl.lit(source_index).alias('source_index'),
+    )
+
+def merge_publications(pubs_list: List[List[Dict]], cr: Crossref = None, cache: CrossrefCache = None,
+                       workers: int = 1, supplemented: Dict[str, Dict] = None,
+                       titles: TitleDoiIndex = None) -> List[Dict]:
+    """Merge publications from different sources, supplementing BibTeX entries with additional data.
+    
+    All sources are concatenated into one lazy frame and grouped in a single
+    pass: entries sharing a DOI form one group, entries without a DOI are
+    grouped by canonical title (see ``title_index.canonical_title``), with
+    near-duplicate titles clustered by ``cluster_titles``, unless a DOI entry
+    has the same title or a near-duplicate one.
+    Each group keeps the fields of its BibTeX entry when it has one.
+    BibTeX entries from the first source whose title got lost are added back.
+    ``supplemented`` and ``titles`` are passed on to ``supplement_publications``.
+    """
+    frames = [publications_frame(pubs, index) if pubs else None for index, pubs in enumerate(pubs_list)]
+    return merge_frames(frames, cr, cache, workers, supplemented, titles)
+
+def merge_frames(frames: List[Optional[pl.DataFrame]], cr: Crossref = None, cache: CrossrefCache = None,
+                 workers: int = 1, supplemented: Dict[str, Dict] = None,
+                 titles: TitleDoiIndex = None) -> List[Dict]:
+    """Merge per-source frames from ``publications_frame``, in source order; see ``merge_publications``."""
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
         return []
+    for frame in frames:
+        log.info("Processing %d publications from %s", len(frame), frame['source'][0])
     
-    merged_df = pl.DataFrame(all_pubs)
+    with instrumentation.stage('merge'):
+        combined_results = _merge_frames(frames)
     
-    # First, separate entries with and without DOIs
-    has_doi_df = None
-    no_doi_df = None
+    # Supplement with Crossref data
+    with instrumentation.stage('supplement'):
+        return supplement_publications(combined_results, cr, cache, workers, supplemented=supplemented, titles=titles)
+
+def _merge_frames(frames: List[pl.DataFrame]) -> List[Dict]:
+    """Group the concatenated source frames into merged publication records."""
+    combined = pl.concat(frames)
+    # Punctuation, LaTeX and Unicode variants of a title share one key
+    pubs = combined.with_columns(
+        canonical_titles(combined['title']).fill_null('').alias('normalized_title'),
+        pl.col('doi').fill_null('').str.to_lowercase().alias('normalized_doi'),
+    )
+    has_doi = pl.col('normalized_doi') != ''
     
-    if 'normalized_doi' in merged_df.columns:
-        has_doi_df = merged_df.filter(pl.col('normalized_doi') != '')
-        no_doi_df = merged_df.filter(pl.col('normalized_doi') == '')
-    else:
-        no_doi_df = merged_df.clone()
-    
-    # Process entries with DOIs
-    doi_results = []
-    if has_doi_df is not None and len(has_doi_df) > 0:
-        # Prioritize bibtex source during grouping
-        has_doi_df = has_doi_df.with_columns(
-            pl.when(pl.col('source') == 'bibtex')
-            .then(1)
-            .otherwise(0)
-            .alias('is_bibtex')
+    # Near-duplicate titles without a DOI share one key: the title of a DOI
+    # entry they match, so that entry covers them, or else one of theirs
+    matches = cluster_titles(pubs.filter(~has_doi)['normalized_title'], pubs.filter(has_doi)['normalized_title'])
+    if matches:
+        pubs = pubs.with_columns(pl.col('normalized_title').replace(matches))
+    pubs = pubs.lazy()
+    
+    merged = (
+        pubs
+        # Titles already covered by a DOI entry are not merged again by title
+        .filter(has_doi | ~has_doi.any().over('normalized_title'))
+        .with_columns(
+            pl.when(has_doi)
+            .then(pl.lit('doi:') + pl.col('normalized_doi'))
+            .otherwise(pl.lit('title:') + pl.col('normalized_title'))
+            .alias('merge_key')
         )
-        
-        grouped = has_doi_df.group_by('normalized_doi')
-        # Aggregate, preferring BibTeX source when available
-        grouped = grouped.agg([
-            # Sort by is_bibtex to get bibtex entry first
-            pl.col('source').sort_by('is_bibtex', descending=True).first().alias('source'),
-            pl.col('title').sort_by('is_bibtex', descending=True).first().alias('title'),
-            pl.col('author').sort_by('is_bibtex', descending=True).first().alias('author'),
-            pl.col('journal').sort_by('is_bibtex', descending=True).first().alias('journal'),
-            pl.col('year').sort_by('is_bibtex', descending=True).first().alias('year'),
-            pl.col('doi').sort_by('is_bibtex', descending=True).first().alias('doi'),
-            pl.col('type').sort_by('is_bibtex', descending=True).first().alias('type'),
-            pl.col('citations').max().fill_null(0).alias('citations')
-        ])
-        doi_results = grouped.to_dicts()
-    
-    # Process entries without DOIs
-    no_doi_results = []
-    if no_doi_df is not None and len(no_doi_df) > 0:
-        # Prioritize bibtex source during grouping
-        no_doi_df = no_doi_df.with_columns(
-            pl.when(pl.col('source') == 'bibtex')
-            .then(1)
-            .otherwise(0)
-            .alias('is_bibtex')
+        # Stable sort so that each group's first row is its BibTeX entry, if any
+        .sort(pl.col('source') == 'bibtex', descending=True, maintain_order=True)
+        .group_by('merge_key', maintain_order=True)
+        .agg(
+            *[pl.col(col).first() for col in MERGE_COLUMNS if col != 'citations'],
+            pl.col('citations').max().fill_null(0),
+            pl.col('normalized_title').first().alias('title_key'),
         )
-        
-        # Filter out titles that might match with DOI entries to avoid duplicates
-        if has_doi_df is not None and len(has_doi_df) > 0:
-            doi_titles = set(has_doi_df.get_column('normalized_title').to_list())
-            no_doi_df = no_doi_df.filter(~pl.col('normalized_title').is_in(doi_titles))
-            
-        if len(no_doi_df) > 0:
-            grouped = no_doi_df.group_by('normalized_title')
-            # Aggregate, preferring BibTeX source when available
-            grouped = grouped.agg([
-                # Sort by is_bibtex to get bibtex entry first
-                pl.col('source').sort_by('is_bibtex', descending=True).first().alias('source'),
-                pl.col('title').sort_by('is_bibtex', descending=True).first().alias('title'),
-                pl.col('author').sort_by('is_bibtex', descending=True).first().alias('author'),
-                pl.col('journal').sort_by('is_bibtex', descending=True).first().alias('journal'),
-                pl.col('year').sort_by('is_bibtex', descending=True).first().alias('year'),
-                pl.col('doi').sort_by('is_bibtex', descending=True).first().alias('doi'),
-                pl.col('type').sort_by('is_bibtex', descending=True).first().alias('type'),
-                pl.col('citations').max().fill_null(0).alias('citations')
-            ])
-            no_doi_results = grouped.to_dicts()
-    
-    # Combine results from DOI and title-based merging
-    combined_results = doi_results + no_doi_results
-    
-    # Now check if any entries from the original bibtex were lost in the process
-    combined_titles = {pub['title'].lower().strip() for pub in combined_results if pub.get('title')}
-    missing_entries = []
-    
-    for entry in bibtex_entries:
-        if not entry.get('title'):
-            continue
-            
-        title = entry['title'].lower().strip()
-        if title not in combined_titles:
-            print(f"\nRecovering lost entry from bibtex: {entry['title'][:100]}")
-            missing_entries.append(entry)
-    
-    # Add missing entries back to the combined results
-    combined_results.extend(missing_entries)
+    )
     
-    # Convert back to list of dicts and supplement with Crossref data
-    result = []
-    for pub in combined_results:
-        print(f"\nMerged publication: {pub.get('title', '')[:100]}")
-        print(f"Pre-supplement authors: {pub.get('author', [])}")
-        supplemented = supplement_with_crossref(pub, cr)
-        print(f"Post-supplement authors: {supplemented.get('author', [])}")
-        result.append(supplemented)
+    # Recover BibTeX entries of the first source whose title did not survive the merge
+    lost = (
+        pubs
+        .filter((pl.col('source_index') == 0) & (pl.col('source') == 'bibtex') & (pl.col('title').fill_null('') != ''))
+        .join(merged.filter(pl.col('title_key') != ''), left_on='normalized_title', right_on='title_key', how='anti')
+    )
     
-    return result
+    merged, lost = pl.collect_all([merged.select(MERGE_COLUMNS), lost.select(MERGE_COLUMNS)])
+    for title in lost['title']:
+        log.info("Recovering lost entry from bibtex: %s", title[:100])
+    # Converting column by column is about three times faster than to_dicts()
+    result = pl.concat([merged, lost])
+    columns = result.columns
+    return [dict(zip(columns, row)) for row in zip(*(result[name].to_list() for name in columns))]
 
 def pub_to_bibtex_entry(pub: Dict) -> Dict:
     """Convert a publication dict to BibTeX entry format."""
@@ -667,8 +1225,8 @@ def pub_to_bibtex_entry(pub: Dict) -> Dict:
     
     return entry
 
-def save_supplemented_bibtex(publications: List[Dict], input_bibtex: str) -> None:
-    """Save supplemented publications as BibTeX with timestamp."""
+def save_supplemented_bibtex(publications: List[Dict], input_bibtex: str, store: SnapshotStore) -> None:
+    """Save supplemented publications as a BibTeX snapshot, unless identical content is already stored."""
     if not publications:
         return
         
@@ -676,24 +1234,92 @@ def save_supplemented_bibtex(publications: List[Dict], input_bibtex: str) -> Non
     db = BibDatabase()
     db.entries = [pub_to_bibtex_entry(pub) for pub in publications]
     
-    # Generate timestamp and filename
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    input_path = Path(input_bibtex)
-    output_path = input_path.parent / f"{input_path.stem}_supplemented_{timestamp}{input_path.suffix}"
-    
-    # Write to file
     writer = bibtexparser.bwriter.BibTexWriter()
     writer.indent = '    '  # Use 4 spaces for indentation
     writer.order_entries_by = ('year', 'author', 'title')
     
-    with open(output_path, 'w', encoding='utf-8') as bibfile:
-        bibfile.write(writer.write(db))
-    print(f"Supplemented BibTeX saved to: {output_path}")
+    input_path = Path(input_bibtex)
+    output_path = store.add(writer.write(db), f"{input_path.stem}_supplemented", input_path.suffix)
+    log.info("Supplemented BibTeX snapshot: %s", output_path)
 
-def main():
-    """Main function."""
-    args = parse_args()
+async def gather_sources(loaders: List[Tuple[str, Callable[[], List[Dict]]]]) -> List[Optional[pl.DataFrame]]:
+    """Run the source loaders concurrently, building each source's merge frame as soon as it arrives.
+    
+    The loaders block on network and disk I/O, so each runs in a worker
+    thread; the total time is close to that of the slowest source instead of
+    the sum of all of them.
+    
+    Args:
+        loaders: (source name, loader) pairs in merge order
+        
+    Returns:
+        The merge frame of each source (None if it has no publications), in
+        the order of ``loaders``
+    """
+    async def load(index: int, name: str, loader: Callable[[], List[Dict]]):
+        start = time.perf_counter()
+        pubs = await asyncio.to_thread(loader)
+        frame = await asyncio.to_thread(publications_frame, pubs, index) if pubs else None
+        return index, name, pubs, frame, time.perf_counter() - start
     
+    frames: List[Optional[pl.DataFrame]] = [None] * len(loaders)
+    tasks = [load(index, name, loader) for index, (name, loader) in enumerate(loaders)]
+    for task in asyncio.as_completed(tasks):
+        index, name, pubs, frame, elapsed = await task
+        frames[index] = frame
+        log.info("%s: %d publications ready after %.1fs", name, len(pubs), elapsed)
+    return frames
+
+def load_title_index(cache: Optional[CrossrefCache], store: SnapshotStore,
+                     frames: List[Optional[pl.DataFrame]]) -> TitleDoiIndex:
+    """Build the title -> DOI index from the Crossref cache, the latest snapshot and the sources.
+    
+    Pairs already persisted in ``cache`` are loaded as they are; titles with
+    DOIs from the latest supplemented BibTeX snapshot and from this run's
+    sources are added on top (and persisted with the other new pairs later).
+    """
+    titles = TitleDoiIndex()
+    if cache:
+        titles.load(cache.get_titles())
+    latest = store.latest()
+    if latest and latest.exists():
+        entries, _ = parse_bibtex(latest.read_text(encoding='utf-8'))
+        for entry in entries:
+            titles.add(entry.get('title', ''), entry.get('doi', ''))
+    for frame in frames:
+        if frame is not None:
+            for title, doi in frame.select('title', 'doi').iter_rows():
+                if title and has_valid_doi({'doi': doi}):
+                    titles.add(title, doi)
+    log.info("Title index: %d known titles", len(titles))
+    return titles
+
+def load_source(name: str, fingerprint: Optional[str], fetch: Callable[[], List[Dict]],
+                previous: Dict, current: Dict) -> List[Dict]:
+    """Get a source's records, reusing the previous run's when its fingerprint is unchanged.
+    
+    Args:
+        name: Source name in the manifest
+        fingerprint: Fingerprint of the source as it is now, or None if it could
+            not be determined (the previous records are then reused if any)
+        fetch: Function fetching the records
+        previous: Source entries of the previous run's manifest
+        current: Source entries of this run, filled in place
+        
+    Returns:
+        The source's publications
+    """
+    old = previous.get(name)
+    if old and (fingerprint is None or old['fingerprint'] == fingerprint):
+        log.info("%s: unchanged, reusing %d publications", name, len(old['records']))
+        current[name] = old
+        return old['records']
+    records = fetch()
+    current[name] = {'fingerprint': fingerprint or content_hash(records), 'records': records}
+    return records
+
+def update(args: argparse.Namespace) -> None:
+    """Update the publications page as configured by the command line arguments."""
     if args.clear:
         if args.output:
             clear_file(args.output)
@@ -701,46 +1327,144 @@ def main():
             clear_file(args.raw_output)
     
     # Initialize Crossref client if needed
-    cr = Crossref(mailto=args.mailto) if args.crossref or args.mailto else None
+    cr = crossref_client(args.mailto) if args.crossref or args.mailto else None
+    
+    cache = None
+    if not args.no_crossref_cache:
+        cache = CrossrefCache(args.crossref_cache)
+        if args.refresh_crossref:
+            cache.invalidate()
     
-    publications = []
+    # State of the previous run; a full rebuild starts from an empty one
+    manifest = Manifest(args.manifest, MANIFEST_VERSION)
+    if args.full_rebuild or args.refresh_crossref:
+        manifest.data = {'version': manifest.version}
+    previous_sources = manifest.get('sources', {})
+    store = SnapshotStore(args.snapshot_dir, args.keep_snapshots)
+    sources: Dict[str, Dict] = {}
+    http_cache = None
+    if not args.no_cache:
+        http_cache = http_client.configure_cache(args.cache_dir, args.cache_ttl * 3600)
+    
+    # Each loader reads one source; they run concurrently
+    loaders = []
     
     # Read from BibTeX file (primary source)
-    bibtex_pubs = get_bibtex_works(args.bibtex)
-    publications.append(bibtex_pubs)
+    def load_bibtex() -> List[Dict]:
+        with instrumentation.stage('parse'):
+            return load_source('bibtex', file_hash(args.bibtex), lambda: get_bibtex_works(args.bibtex),
+                               previous_sources, sources)
+    loaders.append(('bibtex', load_bibtex))
     
     # Fetch from ORCID if enabled
     if args.orcid:
-        orcid_pubs = get_orcid_works(args.orcid)
-        publications.append(orcid_pubs)
+        def load_orcid() -> List[Dict]:
+            with instrumentation.stage('fetch'):
+                summaries = get_orcid_summaries(args.orcid)
+                degraded = []
+                records = load_source(
+                    'orcid', content_hash(summaries) if summaries is not None else None,
+                    lambda: get_orcid_works(args.orcid, summaries, degraded) if summaries is not None else [],
+                    previous_sources, sources
+                )
+                if degraded:
+                    # Works without their full record are fetched again on the next run
+                    log.info("orcid: %d works without full record, not reusing them next time", len(degraded))
+                    sources['orcid'] = dict(sources['orcid'], fingerprint=f"degraded:{sources['orcid']['fingerprint']}")
+                return records
+        loaders.append(('orcid', load_orcid))
     
     # Fetch from Crossref if enabled
     if args.crossref:
-        crossref_pubs = get_crossref_works(args.author, args.mailto)
-        publications.append(crossref_pubs)
+        def load_crossref() -> List[Dict]:
+            with instrumentation.stage('fetch'):
+                crossref_pubs = get_crossref_works(args.author, args.mailto, args.crossref_max_results)
+            sources['crossref'] = {'fingerprint': content_hash(crossref_pubs)}
+            return crossref_pubs
+        loaders.append(('crossref', load_crossref))
+    
+    frames = asyncio.run(gather_sources(loaders))
     
     # Scopus support placeholder
     if args.scopus:
-        print("Scopus support not implemented yet")
+        log.warning("Scopus support not implemented yet")
     
-    # Merge all publications, supplementing with Crossref data
-    merged_pubs = merge_publications(publications, cr)
+    # Merge all publications, supplementing with Crossref data. Merging groups
+    # across all entries, so it reruns whenever any source changed, but only
+    # merged entries not seen before go through Crossref supplementation.
+    inputs_hash = content_hash(sorted([name, source['fingerprint']] for name, source in sources.items()))
+    previous_supplemented = manifest.get('supplemented', {})
+    now = time.time()
+    reusable = {content_hash(entry['pub']) for entry in previous_supplemented.values()
+                if now - entry['stored_at'] <= SUPPLEMENTED_TTL}
+    merged_pubs = manifest.get('merged')
+    if (manifest.get('inputs_hash') == inputs_hash and merged_pubs is not None
+            and all(content_hash(pub) in reusable for pub in merged_pubs)):
+        log.info("Sources unchanged, reusing the merged publications")
+        supplemented = previous_supplemented
+    else:
+        with instrumentation.stage('title_index'):
+            titles = load_title_index(cache, store, frames)
+        merged_pubs = merge_frames(frames, cr, cache, args.crossref_workers, previous_supplemented, titles)
+        instrumentation.record_cache('title index', titles.hits, titles.misses)
+        if cache:
+            cache.put_titles(titles.added)
+        # Keep only the entries this run used so the manifest does not grow forever
+        merged_hashes = {content_hash(pub) for pub in merged_pubs}
+        supplemented = {
+            h: entry for h, entry in previous_supplemented.items() if content_hash(entry['pub']) in merged_hashes
+        }
     
-    # Save supplemented BibTeX
-    save_supplemented_bibtex(merged_pubs, args.bibtex)
+    merged_hash = content_hash(merged_pubs)
+    if merged_hash != manifest.get('merged_hash'):
+        # Save supplemented BibTeX
+        with instrumentation.stage('write'):
+            save_supplemented_bibtex(merged_pubs, args.bibtex, store)
     
     # Generate and save the publications page
-    content = generate_publications_page(merged_pubs, args.author, args.from_year)
-    
+    outputs = manifest.get('outputs', {})
+    page_key = content_hash([merged_hash, args.author, args.from_year])
     if args.output:
-        args.output.parent.mkdir(parents=True, exist_ok=True)
-        args.output.write_text(content)
-        print(f"Publications page written to {args.output}")
+        output = str(args.output)
+        with instrumentation.stage('render'):
+            if outputs.get(output) == [page_key, file_hash(args.output)]:
+                log.info("Publications page %s is up to date", args.output)
+            elif write_publications_page(args.output, merged_pubs, args.author, args.from_year):
+                log.info("Publications page written to %s", args.output)
+            else:
+                log.info("Publications page %s unchanged", args.output)
+        outputs[output] = [page_key, file_hash(args.output)]
     
-    if args.raw_output:
-        args.raw_output.parent.mkdir(parents=True, exist_ok=True)
-        args.raw_output.write_text(json.dumps(merged_pubs, indent=2))
-        print(f"Raw publication data written to {args.raw_output}")
+    with instrumentation.stage('write'):
+        if args.raw_output:
+            if write_if_changed(args.raw_output, json.dumps(merged_pubs, indent=2)):
+                log.info("Raw publication data written to %s", args.raw_output)
+            else:
+                log.info("Raw publication data %s unchanged", args.raw_output)
+        
+        manifest['sources'] = sources
+        manifest['inputs_hash'] = inputs_hash
+        manifest['merged'] = merged_pubs
+        manifest['merged_hash'] = merged_hash
+        manifest['supplemented'] = supplemented
+        manifest['outputs'] = outputs
+        manifest.save()
+    
+    if http_cache:
+        http_cache.prune()
+        instrumentation.record_cache('API response', http_cache.hits, http_cache.misses)
+    if cache:
+        instrumentation.record_cache('Crossref', cache.hits, cache.misses)
+        cache.close()
+
+def main():
+    """Main function."""
+    args = parse_args()
+    try:
+        instrumentation.run(lambda: http_replay.run(update, args), args)
+    except RateLimitExceeded as e:
+        log.error("Giving up: %s", e)
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,25 +1,91 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 import requests
+import http_client
 import argparse
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from urllib.parse import urlparse
 import json
+import logging
 import re
+import sys
+import http_replay
+import instrumentation
+from incremental import write_if_changed
+from rate_limit import MAX_QUOTA_WAIT, RateLimitExceeded, RequestScheduler
 
-def get_github_repos(username: str, token: Optional[str] = None) -> List[Dict]:
-    """Fetch repositories from GitHub."""
+log = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Projects per GitLab list request (the API maximum)
+GITLAB_PER_PAGE = 100
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+# Repositories asked for in one aliased GraphQL query
+GITHUB_GRAPHQL_BATCH = 50
+# Only the fields the repository cards use, plus isFork to skip forks like the REST path
+GITHUB_GRAPHQL_FIELDS = """
+fragment RepoFields on Repository {
+  name
+  description
+  url
+  isFork
+  primaryLanguage { name }
+  stargazerCount
+  forkCount
+  updatedAt
+  repositoryTopics(first: 20) { nodes { topic { name } } }
+}
+"""
+
+# Maximum number of in-flight requests per host when fetching concurrently
+DEFAULT_HOST_LIMIT = 4
+HOST_LIMITS = {
+    'github.com': 8,
+    'code.jgi.doe.gov': 4,
+}
+
+def github_headers(token: Optional[str] = None) -> Dict:
+    """Build the request headers for the GitHub REST API."""
+    headers = {
+        'Accept': 'application/vnd.github.v3+json'
+    }
+    if token:
+        headers['Authorization'] = f'token {token}'
+    return headers
+
+def github_repo_data(repo: Dict) -> Dict:
+    """Convert a GitHub API repository object to our repository dictionary."""
+    return {
+        'name': repo['name'],
+        'description': repo['description'] or '',
+        'url': repo['html_url'],
+        'language': repo['language'] or 'Unknown',
+        'stars': repo['stargazers_count'],
+        'forks': repo['forks_count'],
+        'updated_at': repo['updated_at'],
+        'topics': repo.get('topics', []),
+        'source': 'github'
+    }
+
+def get_github_repos(username: str, token: Optional[str] = None) -> Optional[List[Dict]]:
+    """Fetch repositories from GitHub.
+    
+    Returns:
+        The owner's repositories other than forks, or None if the listing failed
+    """
     try:
-        headers = {
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        if token:
-            headers['Authorization'] = f'token {token}'
+        headers = github_headers(token)
             
         repos = []
         page = 1
         while True:
             url = f"https://api.github.com/users/{username}/repos?page={page}&per_page=100"
-            response = requests.get(url, headers=headers)
+            response = http_client.cached_get(url, headers=headers)
             response.raise_for_status()
             
             page_repos = response.json()
@@ -30,30 +96,172 @@ def get_github_repos(username: str, token: Optional[str] = None) -> List[Dict]:
                 if repo['fork']:  # Skip forks
                     continue
                     
-                repo_data = {
-                    'name': repo['name'],
-                    'description': repo['description'] or '',
-                    'url': repo['html_url'],
-                    'language': repo['language'] or 'Unknown',
-                    'stars': repo['stargazers_count'],
-                    'forks': repo['forks_count'],
-                    'updated_at': repo['updated_at'],
-                    'topics': repo.get('topics', []),
-                    'source': 'github'
-                }
+                repo_data = github_repo_data(repo)
                 repos.append(repo_data)
-                print(f"Found GitHub repo: {repo_data['name']}")
+                log.debug("Found GitHub repo: %s", repo_data['name'])
             
             # Check if there are more pages
-            if 'next' not in {rel[1]: rel[0] for rel in (link.split('; rel="') for link in response.headers.get('Link', '').split(', ') if link)}:
+            if 'next' not in response.links:
                 break
                 
             page += 1
         
         return repos
+    except RateLimitExceeded:
+        raise
     except Exception as e:
-        print(f"Error fetching GitHub repositories: {e}")
-        return []
+        log.warning("Error fetching GitHub repositories: %s", e)
+        return None
+
+def get_github_repo(owner: str, repo_name: str, token: Optional[str] = None) -> Optional[Dict]:
+    """Fetch a single GitHub repository directly, without listing all of the owner's repositories."""
+    try:
+        url = f"https://api.github.com/repos/{owner}/{repo_name}"
+        response = http_client.cached_get(url, headers=github_headers(token))
+        response.raise_for_status()
+        
+        repo = response.json()
+        if repo['fork']:  # Skip forks, same as the owner listing
+            return None
+        
+        repo_data = github_repo_data(repo)
+        log.debug("Found GitHub repo: %s", repo_data['name'])
+        return repo_data
+    except RateLimitExceeded:
+        raise
+    except Exception as e:
+        log.warning("Error fetching GitHub repository %s/%s: %s", owner, repo_name, e)
+        return None
+
+def github_repo_index(repos: List[Dict]) -> Dict[str, Dict]:
+    """Key repositories by lowercased name, as GitHub names are case-insensitive."""
+    return {repo['name'].lower(): repo for repo in repos}
+
+def get_github_repo_index(username: str, token: Optional[str] = None,
+                          index: Optional[Dict[str, Dict[str, Dict]]] = None) -> Dict[str, Dict]:
+    """Get an owner's repositories keyed by name, listing them at most once per run.
+    
+    A failed listing is not stored, so the owner's repositories are then
+    looked up one by one.
+    
+    Args:
+        username: GitHub user or organization
+        token: Optional GitHub token
+        index: Run-scoped owner -> {lowercased repo name: repo data} index, filled in place
+        
+    Returns:
+        Dictionary mapping lowercased repository names to repository information
+    """
+    if index is None:
+        index = {}
+    owner = username.lower()  # GitHub owners are case-insensitive
+    if owner not in index:
+        repos = get_github_repos(username, token)
+        if repos is None:
+            return {}
+        index[owner] = github_repo_index(repos)
+    return index[owner]
+
+def github_graphql_repo_data(repo: Dict) -> Dict:
+    """Convert a GraphQL ``Repository`` node to our repository dictionary."""
+    return {
+        'name': repo['name'],
+        'description': repo['description'] or '',
+        'url': repo['url'],
+        'language': (repo['primaryLanguage'] or {}).get('name') or 'Unknown',
+        'stars': repo['stargazerCount'],
+        'forks': repo['forkCount'],
+        'updated_at': repo['updatedAt'],
+        'topics': [node['topic']['name'] for node in repo['repositoryTopics']['nodes']],
+        'source': 'github'
+    }
+
+def github_graphql_query(paths: List[str]) -> Tuple[str, Dict[str, str]]:
+    """Build one aliased query asking for every ``owner/name`` in ``paths``.
+    
+    Returns:
+        Tuple of (query, variables); repository ``i`` is answered under alias ``r{i}``
+    """
+    params, fields, variables = [], [], {}
+    for i, path in enumerate(paths):
+        owner, name = path.split('/')
+        params.append(f"$o{i}: String!, $n{i}: String!")
+        fields.append(f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepoFields }}")
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+    query = f"query({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}\n" + GITHUB_GRAPHQL_FIELDS
+    return query, variables
+
+def get_github_repos_graphql(paths: List[str], token: str, batch_size: int = GITHUB_GRAPHQL_BATCH,
+                             max_workers: int = 1, limiter: Optional['HostLimiter'] = None) -> Dict[str, Optional[Dict]]:
+    """Fetch named GitHub repositories through the GraphQL API, ``batch_size`` per request.
+    
+    Args:
+        paths: ``owner/name`` repository paths
+        token: GitHub token (the GraphQL API does not accept anonymous requests)
+        batch_size: Repositories per aliased query
+        max_workers: Number of batches to send concurrently
+        limiter: Per-host concurrency limiter shared with the other lookups
+        
+    Returns:
+        Dictionary mapping each lowercased path to its repository information, or to
+        None if the repository does not exist or is a fork. Paths of a batch whose
+        request failed, and paths that came back null with another error than
+        NOT_FOUND (e.g. FORBIDDEN or RATE_LIMITED), are left out, so callers can
+        fall back to REST for them.
+    """
+    paths = list(dict.fromkeys(path.lower() for path in paths))
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    headers = {'Authorization': f'bearer {token}'}
+    
+    def fetch_batch(batch: List[str]) -> Dict[str, Optional[Dict]]:
+        query, variables = github_graphql_query(batch)
+        response = http_client.request('POST', GITHUB_GRAPHQL_URL, headers=headers,
+                                       json={'query': query, 'variables': variables})
+        response.raise_for_status()
+        body = response.json()
+        data = body.get('data')
+        if data is None:
+            raise ValueError(f"GraphQL query failed: {body.get('errors')}")
+        # Missing repositories come back as null with a NOT_FOUND error; other
+        # errors mean the lookup failed, not that the repository does not exist
+        failed = set()
+        for error in body.get('errors', []):
+            if error.get('type') != 'NOT_FOUND':
+                log.warning("GitHub GraphQL error: %s", error.get('message', error))
+                # An error without a path may concern any null alias of the batch
+                failed.update(error.get('path', [])[:1] or data)
+        results = {}
+        for i, path in enumerate(batch):
+            repo = data.get(f"r{i}")
+            if repo is None and f"r{i}" in failed:
+                continue
+            if repo is None or repo['isFork']:
+                results[path] = None
+                continue
+            results[path] = github_graphql_repo_data(repo)
+            log.debug("Found GitHub repo: %s", repo['name'])
+        return results
+    
+    results: Dict[str, Optional[Dict]] = {}
+    for batch_results in fetch_concurrently(batches, fetch_batch, lambda batch: 'github.com', max_workers, limiter):
+        results.update(batch_results or {})
+    log.info("Resolved %d GitHub repositories in %d GraphQL requests", len(results), len(batches))
+    return results
+
+def gitlab_repo_data(repo: Dict) -> Dict:
+    """Extract the fields used on the software page from a GitLab project record."""
+    return {
+        'name': repo['name'],
+        'description': repo.get('description') or '',
+        'url': repo['web_url'],
+        'language': repo.get('language') or 'Unknown',
+        'stars': repo.get('star_count', 0),
+        'forks': repo.get('forks_count', 0),
+        'updated_at': repo.get('last_activity_at'),
+        'topics': repo.get('topics', []) or repo.get('tag_list', []),
+        'source': 'gitlab'
+    }
 
 def get_gitlab_repo_by_path(base_url: str, repo_path: str, headers: Dict) -> Optional[Dict]:
     """Fetch a single GitLab repository by its path."""
@@ -61,108 +269,98 @@ def get_gitlab_repo_by_path(base_url: str, repo_path: str, headers: Dict) -> Opt
         # Encode the repo path for the URL
         encoded_path = requests.utils.quote(repo_path, safe='')
         project_url = f"{base_url}/api/v4/projects/{encoded_path}"
-        print(f"Looking up GitLab project: {project_url}")
+        log.debug("Looking up GitLab project: %s", project_url)
         
-        response = requests.get(project_url, headers=headers)
+        response = http_client.cached_get(project_url, headers=headers)
         response.raise_for_status()
         
         repo = response.json()
         if repo.get('forked_from_project'):
             return None
             
-        # Get primary language - now included in the response
-        main_language = repo.get('language') or 'Unknown'
-        
-        repo_data = {
-            'name': repo['name'],
-            'description': repo.get('description') or '',
-            'url': repo['web_url'],
-            'language': main_language,
-            'stars': repo.get('star_count', 0),
-            'forks': repo.get('forks_count', 0),
-            'updated_at': repo.get('last_activity_at'),
-            'topics': repo.get('topics', []) or repo.get('tag_list', []),
-            'source': 'gitlab'
-        }
-        print(f"Found GitLab repo: {repo_data['name']} ({main_language})")
+        repo_data = gitlab_repo_data(repo)
+        log.debug("Found GitLab repo: %s (%s)", repo_data['name'], repo_data['language'])
         return repo_data
+    except RateLimitExceeded:
+        raise
     except Exception as e:
-        print(f"Error fetching GitLab repository {repo_path}: {e}")
+        log.warning("Error fetching GitLab repository %s: %s", repo_path, e)
         return None
 
-def get_gitlab_repos(instance: str, username: str, token: Optional[str] = None) -> List[Dict]:
-    """Fetch repositories from GitLab."""
-    try:
-        headers = {
-            'Accept': 'application/json'
-        }
-        if token:
-            headers['PRIVATE-TOKEN'] = token
-            
-        # Ensure instance URL is properly formatted
-        base_url = instance.rstrip('/')
-        
-        # First get user ID
-        user_url = f"{base_url}/api/v4/users?username={username}"
-        print(f"Looking up GitLab user: {user_url}")
-        user_response = requests.get(user_url, headers=headers)
-        user_response.raise_for_status()
-        
-        users = user_response.json()
-        if not users:
-            print(f"GitLab user {username} not found")
-            return []
-            
-        user_id = users[0]['id']
-        print(f"Found GitLab user ID: {user_id}")
-        
-        # Then get user's projects with detailed information
-        projects_url = f"{base_url}/api/v4/users/{user_id}/projects"
-        print(f"Fetching GitLab projects: {projects_url}")
-        response = requests.get(
-            projects_url,
-            headers=headers,
-            params={
-                'visibility': 'public',
-                'order_by': 'last_activity_at',
-                'sort': 'desc',
-                'statistics': 'true',  # Get repository statistics
-                'with_programming_language': 'true'  # Get language information
-            }
-        )
+def iter_gitlab_pages(url: str, headers: Dict, params: Dict) -> Iterator[Dict]:
+    """Yield every record of a GitLab list endpoint, one page of ``GITLAB_PER_PAGE`` at a time.
+    
+    Keyset pagination is requested, so pages stay cheap however deep the
+    listing goes; endpoints that do not support it answer with an error and
+    are read with offset pagination instead. Either way the next page is
+    taken from the ``Link`` header.
+    """
+    params = dict(params, pagination='keyset', order_by='id', sort='asc', per_page=GITLAB_PER_PAGE)
+    response = http_client.cached_get(url, headers=headers, params=params)
+    if response.status_code in (400, 405):
+        log.debug("Keyset pagination not supported for %s, using offset pagination", url)
+        del params['pagination']
+        response = http_client.cached_get(url, headers=headers, params=params)
+    
+    while True:
         response.raise_for_status()
+        yield from response.json()
+        next_url = response.links.get('next', {}).get('url')
+        if not next_url:
+            break
+        response = http_client.cached_get(next_url, headers=headers)
+
+def iter_gitlab_repos(instance: str, username: str, token: Optional[str] = None) -> Iterator[Dict]:
+    """Yield a GitLab user's public repositories (forks excluded) as they are fetched."""
+    headers = {
+        'Accept': 'application/json'
+    }
+    if token:
+        headers['PRIVATE-TOKEN'] = token
         
-        repos = []
-        for repo in response.json():
-            try:
-                # Skip if it's a fork
-                if repo.get('forked_from_project'):
-                    continue
-                    
-                # Get primary language - now included in the response
-                main_language = repo.get('language') or 'Unknown'
-                
-                repo_data = {
-                    'name': repo['name'],
-                    'description': repo.get('description') or '',
-                    'url': repo['web_url'],
-                    'language': main_language,
-                    'stars': repo.get('star_count', 0),
-                    'forks': repo.get('forks_count', 0),
-                    'updated_at': repo.get('last_activity_at'),
-                    'topics': repo.get('topics', []) or repo.get('tag_list', []),
-                    'source': 'gitlab'
-                }
-                repos.append(repo_data)
-                print(f"Found GitLab repo: {repo_data['name']} ({main_language})")
-            except Exception as e:
-                print(f"Error processing GitLab repo {repo.get('name', 'unknown')}: {e}")
-                continue
+    # Ensure instance URL is properly formatted
+    base_url = instance.rstrip('/')
+    
+    # First get user ID
+    user_url = f"{base_url}/api/v4/users?username={username}"
+    log.debug("Looking up GitLab user: %s", user_url)
+    user_response = http_client.cached_get(user_url, headers=headers)
+    user_response.raise_for_status()
+    
+    users = user_response.json()
+    if not users:
+        log.warning("GitLab user %s not found", username)
+        return
         
-        return repos
+    user_id = users[0]['id']
+    log.debug("Found GitLab user ID: %s", user_id)
+    
+    # Then page through the user's projects
+    projects_url = f"{base_url}/api/v4/users/{user_id}/projects"
+    log.debug("Fetching GitLab projects: %s", projects_url)
+    for repo in iter_gitlab_pages(projects_url, headers, {'visibility': 'public'}):
+        try:
+            # Skip if it's a fork
+            if repo.get('forked_from_project'):
+                continue
+            
+            repo_data = gitlab_repo_data(repo)
+            log.debug("Found GitLab repo: %s (%s)", repo_data['name'], repo_data['language'])
+            yield repo_data
+        except Exception as e:
+            log.warning("Error processing GitLab repo %s: %s", repo.get('name', 'unknown'), e)
+
+def get_gitlab_repos(instance: str, username: str, token: Optional[str] = None) -> List[Dict]:
+    """Fetch repositories from GitLab."""
+    repos = []
+    try:
+        for repo in iter_gitlab_repos(instance, username, token):
+            repos.append(repo)
+    except RateLimitExceeded:
+        raise
     except Exception as e:
-        print(f"Error fetching GitLab repositories: {e}")
-        return []
+        log.warning("Error fetching GitLab repositories: %s", e)
+    return repos
 
 def format_repo(repo: Dict) -> str:
     """Format a repository in MkDocs format."""
@@ -189,37 +387,80 @@ def format_repo(repo: Dict) -> str:
     {topics_str}
 """
 
+# Language to emoji mapping
+LANGUAGE_ICONS = {
+    'Python': '🐍',
+    'R': '📊',
+    'JavaScript': '☕',
+    'TypeScript': '📘',
+    'Java': '☕',
+    'C++': '⚡',
+    'C': '⚙️',
+    'Shell': '🐚',
+    'Ruby': '💎',
+    'Go': '🐹',
+    'Rust': '🦀',
+    'PHP': '🐘',
+    'Swift': '🦅',
+    'Kotlin': '🎯',
+    'Jupyter Notebook': '📓',
+    'HTML': '🌐',
+    'CSS': '🎨',
+    'Perl': '🐪',
+    'Julia': '📊',
+    'Scala': '⚡',
+    'Haskell': 'λ',
+    'Unknown': '📦'
+}
+
+def sort_repos(repos: List[Dict]) -> None:
+    """Sort repositories in place in page order (by stars, then last update)."""
+    repos.sort(key=lambda x: (-(x.get('stars', 0) or 0), x.get('updated_at', '')), reverse=True)
+
+def format_repo_card(repo: Dict) -> str:
+    """Format one repository as a card of the software page."""
+    name = repo['name']
+    description = repo.get('description', '').replace('\n', ' ').strip() or 'No description available.'
+    url = repo['url']
+    stars = repo.get('stars', 0) or 0
+    language = repo.get('language', 'Unknown')
+    updated_at = repo.get('updated_at', '')
+    topics = repo.get('topics', [])
+    
+    # Get language emoji
+    lang_icon = LANGUAGE_ICONS.get(language, '📦')
+    
+    content = [f"""
+<div class="repo-card" data-stars="{stars}" data-language="{language}" data-date="{updated_at}">
+    <h3><a href="{url}">{name}</a></h3>
+    <div class="repo-meta">
+        <span>{lang_icon} {language}</span>
+        <span>⭐ {stars}</span>
+        <span>📅 {updated_at[:10]}</span>
+    </div>
+    <p>{description}</p>"""]
+    
+    if topics:
+        content.append('    <div class="repo-topics">')
+        for topic in topics:
+            content.append(f'        <span class="repo-topic">{topic}</span>')
+        content.append('    </div>')
+    
+    content.append('</div>\n')
+    return '\n'.join(content)
+
 def generate_software_page(repos: List[Dict]) -> str:
-    """Generate the full software page content."""
+    """Generate the full software page content.
+    
+    Args:
+        repos: Repository records; sorted in place into page order
+        
+    Returns:
+        The page content
+    """
     if not repos:
         return "# Software\n\nNo repositories found."
 
-    # Language to emoji mapping
-    language_icons = {
-        'Python': '🐍',
-        'R': '📊',
-        'JavaScript': '☕',
-        'TypeScript': '📘',
-        'Java': '☕',
-        'C++': '⚡',
-        'C': '⚙️',
-        'Shell': '🐚',
-        'Ruby': '💎',
-        'Go': '🐹',
-        'Rust': '🦀',
-        'PHP': '🐘',
-        'Swift': '🦅',
-        'Kotlin': '🎯',
-        'Jupyter Notebook': '📓',
-        'HTML': '🌐',
-        'CSS': '🎨',
-        'Perl': '🐪',
-        'Julia': '📊',
-        'Scala': '⚡',
-        'Haskell': 'λ',
-        'Unknown': '📦'
-    }
-
     content = ["# Software\n"]
     
     # Add sorting buttons
@@ -234,42 +475,35 @@ def generate_software_page(repos: List[Dict]) -> str:
     content.append('<div id="repo-container">\n')
 
     # Sort repositories by stars initially
-    repos.sort(key=lambda x: (-(x.get('stars', 0) or 0), x.get('updated_at', '')), reverse=True)
+    sort_repos(repos)
 
     for repo in repos:
-        name = repo['name']
-        description = repo.get('description', '').replace('\n', ' ').strip() or 'No description available.'
-        url = repo['url']
-        stars = repo.get('stars', 0) or 0
-        language = repo.get('language', 'Unknown')
-        updated_at = repo.get('updated_at', '')
-        topics = repo.get('topics', [])
-        
-        # Get language emoji
-        lang_icon = language_icons.get(language, '📦')
-        
-        content.append(f"""
-<div class="repo-card" data-stars="{stars}" data-language="{language}" data-date="{updated_at}">
-    <h3><a href="{url}">{name}</a></h3>
-    <div class="repo-meta">
-        <span>{lang_icon} {language}</span>
-        <span>⭐ {stars}</span>
-        <span>📅 {updated_at[:10]}</span>
-    </div>
-    <p>{description}</p>""")
-        
-        if topics:
-            content.append('    <div class="repo-topics">')
-            for topic in topics:
-                content.append(f'        <span class="repo-topic">{topic}</span>')
-            content.append('    </div>')
-        
-        content.append('</div>\n')
+        content.append(format_repo_card(repo))
 
     content.append('</div>')  # Close repo-container
     
     return '\n'.join(content)
 
+def load_repos(path: Path) -> Optional[List[Dict]]:
+    """Load previously written repository records, or None if there are none."""
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+def diff_repos(old: List[Dict], new: List[Dict]) -> Tuple[List[str], List[str], List[str]]:
+    """Compare two lists of repository records keyed by URL.
+    
+    Returns:
+        URLs of the added, removed and changed repositories
+    """
+    old_by_url = {repo['url']: repo for repo in old}
+    new_by_url = {repo['url']: repo for repo in new}
+    added = [url for url in new_by_url if url not in old_by_url]
+    removed = [url for url in old_by_url if url not in new_by_url]
+    changed = [url for url, repo in new_by_url.items() if url in old_by_url and old_by_url[url] != repo]
+    return added, removed, changed
+
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -286,6 +520,11 @@ def parse_args() -> argparse.Namespace:
         "-t", "--github-token",
         help="GitHub personal access token for higher rate limits"
     )
+    parser.add_argument(
+        "--github-graphql",
+        action="store_true",
+        help="Resolve the GitHub URLs of --from-file in batched GraphQL queries (needs --github-token)"
+    )
     parser.add_argument(
         "-l", "--gitlab-instance",
         default="https://code.jgi.doe.gov",
@@ -323,8 +562,56 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Clear the output files before writing"
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=http_client.DEFAULT_CACHE_DIR,
+        help="Directory for the conditional-request cache of API responses"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=http_client.DEFAULT_CACHE_TTL / 3600,
+        help="Hours a cached API response may be revalidated before it is dropped"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not cache API responses"
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=8,
+        help="Number of repository URLs to look up concurrently (1 = sequential)"
+    )
+    parser.add_argument(
+        "--host-limit",
+        action="append",
+        default=[],
+        metavar="HOST=N",
+        help="Maximum concurrent requests to HOST (repeatable, e.g. github.com=8)"
+    )
+    parser.add_argument(
+        "--max-quota-wait",
+        type=float,
+        default=MAX_QUOTA_WAIT / 60,
+        help="Minutes to wait for an exhausted API rate limit to reset before giving up"
+    )
+    http_replay.add_arguments(parser)
+    instrumentation.add_arguments(parser, "update_software")
     return parser.parse_args()
 
+def parse_host_limits(values: List[str]) -> Dict[str, int]:
+    """Parse ``HOST=N`` strings into a host -> limit dictionary."""
+    limits = {}
+    for value in values:
+        host, sep, limit = value.partition('=')
+        if not sep or not limit.strip().isdigit():
+            raise ValueError(f"Invalid host limit (expected HOST=N): {value}")
+        limits[host.strip().lower()] = int(limit)
+    return limits
+
 def clear_file(file_path: Path) -> None:
     """Clear the contents of a file if it exists."""
     if file_path.exists():
@@ -361,13 +648,18 @@ def parse_repo_url(url: str) -> Tuple[str, str, str]:
     
     raise ValueError(f"Invalid repository URL: {url}")
 
-def get_repo_from_url(url: str, github_token: Optional[str] = None, gitlab_token: Optional[str] = None) -> Optional[Dict]:
+def get_repo_from_url(url: str, github_token: Optional[str] = None, gitlab_token: Optional[str] = None,
+                      github_index: Optional[Dict[str, Dict[str, Dict]]] = None) -> Optional[Dict]:
     """Get repository information from a URL.
     
     Args:
         url: Repository URL
         github_token: Optional GitHub token
         gitlab_token: Optional GitLab token
+        github_index: Optional run-scoped owner -> {lowercased repo name: repo data}
+            index. Repositories in the index are answered from it; others, such
+            as forks or repositories of owners whose listing failed, are
+            fetched directly.
         
     Returns:
         Repository information dictionary or None if not found
@@ -377,8 +669,8 @@ def get_repo_from_url(url: str, github_token: Optional[str] = None, gitlab_token
         
         if source == 'github':
             username, repo_name = repo_path.split('/')
-            repos = get_github_repos(username, github_token)
-            return next((repo for repo in repos if repo['name'] == repo_name), None)
+            indexed = (github_index or {}).get(username.lower(), {}).get(repo_name.lower())
+            return indexed or get_github_repo(username, repo_name, github_token)
         else:  # gitlab
             headers = {
                 'Accept': 'application/json'
@@ -388,78 +680,257 @@ def get_repo_from_url(url: str, github_token: Optional[str] = None, gitlab_token
                 
             return get_gitlab_repo_by_path(instance, repo_path, headers)
             
+    except RateLimitExceeded:
+        raise
     except Exception as e:
-        print(f"Error processing repository URL {url}: {e}")
+        log.warning("Error processing repository URL %s: %s", url, e)
         return None
 
-def get_repos_from_file(file_path: str, github_token: Optional[str] = None, gitlab_token: Optional[str] = None) -> List[Dict]:
+def read_repo_urls(file_path: str) -> List[str]:
+    """Read repository URLs from a file, skipping blank lines and comments."""
+    urls = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            url = line.strip()
+            if not url or url.startswith('#'):
+                continue
+            urls.append(url)
+    return urls
+
+def github_owner_counts(urls: List[str]) -> Dict[str, int]:
+    """Count how many GitHub repositories are wanted from each (lowercased) owner."""
+    counts: Dict[str, int] = {}
+    for url in urls:
+        try:
+            source, _, repo_path = parse_repo_url(url)
+        except ValueError:
+            continue
+        if source == 'github':
+            owner = repo_path.split('/')[0].lower()
+            counts[owner] = counts.get(owner, 0) + 1
+    return counts
+
+def github_path(url: str) -> Optional[str]:
+    """Get the lowercased ``owner/name`` of a GitHub repository URL, or None for other URLs."""
+    try:
+        source, _, repo_path = parse_repo_url(url)
+    except ValueError:
+        return None
+    return repo_path.lower() if source == 'github' else None
+
+def url_host(url: str) -> str:
+    """Get the host name of a URL, used to pick its concurrency limit."""
+    host = urlparse(url.strip()).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+class HostLimiter:
+    """Caps the number of concurrent requests made to each host."""
+    
+    def __init__(self, host_limits: Optional[Dict[str, int]] = None, default_limit: int = DEFAULT_HOST_LIMIT):
+        self.host_limits = {**HOST_LIMITS, **(host_limits or {})}
+        self.default_limit = default_limit
+        self._semaphores: Dict[str, BoundedSemaphore] = {}
+        self._lock = Lock()
+    
+    def semaphore(self, host: str) -> BoundedSemaphore:
+        """Get the semaphore guarding a host, creating it on first use."""
+        with self._lock:
+            if host not in self._semaphores:
+                limit = max(1, self.host_limits.get(host, self.default_limit))
+                self._semaphores[host] = BoundedSemaphore(limit)
+            return self._semaphores[host]
+
+def fetch_concurrently(items: List[T], fetch: Callable[[T], R], host_of: Callable[[T], str],
+                       max_workers: int = 1, limiter: Optional[HostLimiter] = None) -> List[Optional[R]]:
+    """Apply ``fetch`` to every item on a thread pool, respecting per-host limits.
+    
+    Args:
+        items: Inputs to fetch
+        fetch: Function doing the (blocking) fetch for one item
+        host_of: Function returning the host an item is fetched from
+        max_workers: Size of the thread pool; 1 fetches sequentially
+        limiter: Per-host concurrency limiter
+        
+    Returns:
+        Results in the same order as ``items``. An item whose fetch raised gives None.
+    """
+    if limiter is None:
+        limiter = HostLimiter()
+    
+    def run(item: T) -> Optional[R]:
+        try:
+            with limiter.semaphore(host_of(item)):
+                return fetch(item)
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            log.warning("Error fetching %s: %s", item, e)
+            return None
+    
+    if max_workers <= 1 or len(items) <= 1:
+        return [run(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, items))
+
+def get_repos_from_file(file_path: str, github_token: Optional[str] = None, gitlab_token: Optional[str] = None,
+                        github_index: Optional[Dict[str, Dict[str, Dict]]] = None, max_workers: int = 1,
+                        host_limits: Optional[Dict[str, int]] = None, graphql: bool = False) -> List[Dict]:
     """Get repository information from a file containing repository URLs.
     
+    GitHub owners with more than one URL in the file are listed once and shared through
+    ``github_index``; owners with a single URL are looked up with one direct request.
+    With ``graphql`` (and a token) the GitHub URLs are instead resolved in aliased
+    GraphQL queries of ``GITHUB_GRAPHQL_BATCH`` repositories each.
+    With ``max_workers`` > 1 the lookups run concurrently, at most ``host_limits[host]``
+    at a time per host, and the results keep the order of the file.
+    
     Args:
         file_path: Path to file containing repository URLs (one per line)
         github_token: Optional GitHub token
         gitlab_token: Optional GitLab token
+        github_index: Optional run-scoped owner -> {lowercased repo name: repo data} index
+        max_workers: Number of concurrent lookups
+        host_limits: Per-host concurrency caps, overriding ``HOST_LIMITS``
+        graphql: Resolve GitHub URLs through the GraphQL API
         
     Returns:
         List of repository information dictionaries
     """
+    if github_index is None:
+        github_index = {}
+    limiter = HostLimiter(host_limits)
     repos = []
     try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                url = line.strip()
-                if not url or url.startswith('#'):
-                    continue
-                    
-                repo = get_repo_from_url(url, github_token, gitlab_token)
-                if repo:
-                    repos.append(repo)
-                    print(f"Found repository from URL: {url}")
-                else:
-                    print(f"Could not find repository: {url}")
+        urls = read_repo_urls(file_path)
+        
+        # Resolve GitHub URLs of owners not listed yet in batched GraphQL queries
+        resolved: Dict[str, Optional[Dict]] = {}
+        if graphql and github_token:
+            paths = [path for path in map(github_path, urls)
+                     if path and path.split('/')[0] not in github_index]
+            resolved = get_github_repos_graphql(paths, github_token, max_workers=max_workers, limiter=limiter)
+        elif graphql:
+            log.warning("The GitHub GraphQL API needs a token; falling back to REST lookups")
+        
+        # List shared owners first so the per-URL lookups below only read the index
+        unresolved = [url for url in urls if github_path(url) not in resolved]
+        shared_owners = [owner for owner, count in github_owner_counts(unresolved).items()
+                         if count > 1 and owner not in github_index]
+        owner_repos = fetch_concurrently(
+            shared_owners,
+            lambda owner: get_github_repos(owner, github_token),
+            lambda owner: 'github.com',
+            max_workers,
+            limiter
+        )
+        for owner, owned in zip(shared_owners, owner_repos):
+            # Owners whose listing failed are left out, so their URLs are fetched directly
+            if owned is not None:
+                github_index[owner] = github_repo_index(owned)
+        
+        url_repos = fetch_concurrently(
+            urls,
+            lambda url: resolved[github_path(url)] if github_path(url) in resolved
+                        else get_repo_from_url(url, github_token, gitlab_token, github_index),
+            url_host,
+            max_workers,
+            limiter
+        )
+        for url, repo in zip(urls, url_repos):
+            if repo:
+                repos.append(repo)
+                log.debug("Found repository from URL: %s", url)
+            else:
+                log.warning("Could not find repository: %s", url)
+    except RateLimitExceeded:
+        raise
     except Exception as e:
-        print(f"Error reading repository URLs from {file_path}: {e}")
+        log.error("Error reading repository URLs from %s: %s", file_path, e)
         
     return repos
 
-def main():
-    """Main function."""
-    args = parse_args()
-    
+def update(args: argparse.Namespace) -> None:
+    """Update the software page as configured by the command line arguments."""
     if args.clear:
         if args.output:
             clear_file(args.output)
         if args.raw_output:
             clear_file(args.raw_output)
     
+    cache = None
+    if not args.no_cache:
+        cache = http_client.configure_cache(args.cache_dir, args.cache_ttl * 3600)
+    # Pace GitHub and GitLab requests by their reported quota; a run that
+    # cannot finish within it fails instead of writing a short page
+    http_client.configure_scheduler(RequestScheduler(max_wait=args.max_quota_wait * 60))
+    
     # Fetch repositories
     repos = []
     
-    # Get repositories from file if specified
-    if args.from_file:
-        file_repos = get_repos_from_file(args.from_file, args.github_token, args.gitlab_token)
-        repos.extend(file_repos)
-    
-    # Get GitHub repositories
-    github_repos = get_github_repos(args.github_user, args.github_token)
-    repos.extend(github_repos)
-    
-    # Get GitLab repositories
-    gitlab_repos = get_gitlab_repos(args.gitlab_instance, args.gitlab_user, args.gitlab_token)
-    repos.extend(gitlab_repos)
-    
-    # Generate and save the software page
-    content = generate_software_page(repos)
+    with instrumentation.stage('fetch'):
+        # Owner -> {lowercased repo name: repo data}, shared by the file lookups and the user listing
+        github_index = {}
+        if args.github_user:
+            get_github_repo_index(args.github_user, args.github_token, github_index)
+        
+        # Get repositories from file if specified
+        if args.from_file:
+            file_repos = get_repos_from_file(args.from_file, args.github_token, args.gitlab_token, github_index,
+                                             args.workers, parse_host_limits(args.host_limit),
+                                             args.github_graphql)
+            repos.extend(file_repos)
+        
+        # Get GitHub repositories
+        github_repos = list(get_github_repo_index(args.github_user, args.github_token, github_index).values())
+        repos.extend(github_repos)
+        
+        # Get GitLab repositories
+        gitlab_repos = get_gitlab_repos(args.gitlab_instance, args.gitlab_user, args.gitlab_token)
+        repos.extend(gitlab_repos)
     
-    if args.output:
-        args.output.parent.mkdir(parents=True, exist_ok=True)
-        args.output.write_text(content)
-        print(f"Software page written to {args.output}")
+    # Compare with the records written last time; if nothing changed, leave
+    # the outputs alone so mkdocs does not see new mtimes
+    sort_repos(repos)
+    previous = load_repos(args.raw_output) if args.raw_output and not args.clear else None
+    outputs_exist = not args.output or args.output.exists()
+    if previous is not None:
+        added, removed, changed = diff_repos(previous, repos)
+        log.info("Repositories: %d added, %d removed, %d changed", len(added), len(removed), len(changed))
+        for label, urls in (('added', added), ('removed', removed), ('changed', changed)):
+            for url in urls:
+                log.info("  %s: %s", label, url)
+    if previous == repos and outputs_exist:
+        log.info("No repository changes, leaving the software page as is")
+    else:
+        # Generate and save the software page
+        with instrumentation.stage('render'):
+            content = generate_software_page(repos)
+        
+        with instrumentation.stage('write'):
+            if args.output:
+                if write_if_changed(args.output, content):
+                    log.info("Software page written to %s", args.output)
+                else:
+                    log.info("Software page %s unchanged", args.output)
+            
+            if args.raw_output:
+                if write_if_changed(args.raw_output, json.dumps(repos, indent=2)):
+                    log.info("Raw repository data written to %s", args.raw_output)
+                else:
+                    log.info("Raw repository data %s unchanged", args.raw_output)
     
-    if args.raw_output:
-        args.raw_output.parent.mkdir(parents=True, exist_ok=True)
-        args.raw_output.write_text(json.dumps(repos, indent=2))
-        print(f"Raw repository data written to {args.raw_output}")
+    if cache:
+        cache.prune()
+        instrumentation.record_cache('API response', cache.hits, cache.misses)
+
+def main():
+    """Main function."""
+    args = parse_args()
+    try:
+        instrumentation.run(lambda: http_replay.run(update, args), args)
+    except RateLimitExceeded as e:
+        log.error("Giving up: %s", e)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file